@@ -0,0 +1,90 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+
+from utils.export_utils import LINK_COLUMNS, EXTENSIONS, available_formats, iter_links, iter_section_links, \
+    read_link_columns, write_links
+
+
+def load_inputs(years, structured_paths):
+    inputs = {}
+    for year in years:
+        path = f'data/document_info/extracted_links_{year}.json'
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                inputs[f"links_{year}"] = (path, json.load(f))
+    for path in structured_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            inputs[os.path.basename(path)] = (path, list(iter_section_links(json.load(f))))
+    return inputs
+
+
+def timed(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def bench_json(records, path, indent, repeat):
+    def write():
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=indent, separators=None if indent else (',', ':'))
+
+    def load():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    write_ms, _ = timed(write, repeat)
+    load_ms, loaded = timed(load, repeat)
+    # JSON 没有按列读取，取一列也要解析整个文件
+    column_ms, _ = timed(lambda: [record.get('url') for record in load()], repeat)
+    return os.path.getsize(path), write_ms, load_ms, column_ms, loaded == records
+
+
+def bench_format(records, path, fmt, repeat):
+    write_ms, _ = timed(lambda: write_links(records, path, fmt), repeat)
+    load_ms, loaded = timed(lambda: list(iter_links(path)), repeat)
+    column_ms, _ = timed(lambda: read_link_columns(path, ['url']), repeat)
+    expected = [{column: record.get(column) for column in LINK_COLUMNS} for record in records]
+    return os.path.getsize(path), write_ms, load_ms, column_ms, loaded == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare size and load time of exported link records against JSON")
+    parser.add_argument('--years', type=int, nargs='+', default=[2018, 2020, 2022, 2023, 2024])
+    parser.add_argument('--structured', nargs='*', default=None)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    structured_paths = args.structured if args.structured is not None else sorted(glob.glob('structured_content_test_*.json'))
+    inputs = load_inputs(args.years, structured_paths)
+    formats = available_formats()
+    print(f"Available formats: {', '.join(formats)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (source, records) in inputs.items():
+            print(f"\n== {name}: {len(records)} links ({source}, {os.path.getsize(source)} bytes) ==")
+            print(f"{'format':<14} {'bytes':>10} {'write ms':>10} {'load ms':>10} {'1 column ms':>12}  identical")
+            results = {
+                'json indent=2': bench_json(records, os.path.join(tmp, 'indent.json'), 2, args.repeat),
+                'json compact': bench_json(records, os.path.join(tmp, 'compact.json'), None, args.repeat),
+            }
+            for fmt in formats:
+                results[fmt] = bench_format(records, os.path.join(tmp, f"links{EXTENSIONS[fmt]}"), fmt, args.repeat)
+
+            # 现有的 indent=2 JSON 输出作为基准
+            baseline = results['json indent=2'][0]
+            for fmt, (size, write_ms, load_ms, column_ms, identical) in results.items():
+                print(f"{fmt:<14} {size:>10} {write_ms:>10.1f} {load_ms:>10.1f} {column_ms:>12.1f}  {identical}"
+                      f"  ({size / baseline:.0%} of indent=2)")
+
+
+if __name__ == "__main__":
+    main()
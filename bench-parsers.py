@@ -0,0 +1,79 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urljoin
+
+from utils.html_parser import available_backends
+from utils.http_utils import canonicalize_url
+from utils.link_utils import extract_all_links
+from utils.page import load_page
+from utils.probe_cache import ProbeCache
+from utils.structure_utils import extract_structured_content
+
+BASE_URL = 'https://www.nyserda.ny.gov/All-Programs/Offshore-Wind/Focus-Areas/Offshore-Wind-Solicitations/'
+
+
+# 预先填充探测缓存，使基准测试完全离线，只测解析和提取耗时
+def offline_cache(pages):
+    cache = ProbeCache(':memory:')
+    for page in pages:
+        for link in page.soup.find_all('a', href=True):
+            full_url = urljoin(page.url, link['href'])
+            file_type = 'pdf' if full_url.lower().split('?')[0].endswith('.pdf') else 'html'
+            cache.put(canonicalize_url(full_url), file_type=file_type, file_url=full_url)
+    return cache
+
+
+def run_backend(url, path, backend, cache):
+    page = load_page(url, path, parser=backend)
+
+    start = time.perf_counter()
+    page.soup
+    parsed = time.perf_counter()
+
+    links = extract_all_links(url, page=page, cache=cache)
+    structured, link_stats = extract_structured_content(url, page=page, cache=cache)
+    extracted = time.perf_counter()
+
+    # 以序列化结果的哈希比较不同后端的输出是否逐字节一致
+    output = json.dumps([links, structured, link_stats], ensure_ascii=False).encode('utf-8')
+    return parsed - start, extracted - parsed, hashlib.sha256(output).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved snapshots")
+    parser.add_argument('--years', type=int, nargs='+', default=[2018, 2020])
+    parser.add_argument('--snaps-dir', default='data/snaps')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Available backends: {', '.join(backends)}")
+
+    for year in args.years:
+        path = os.path.join(args.snaps_dir, f"{year}.html")
+        if not os.path.exists(path):
+            print(f"[Skip] {path} not found, run filename-link.py first")
+            continue
+
+        url = f"{BASE_URL}{year}-Solicitation"
+        cache = offline_cache([load_page(url, path, parser=backend) for backend in backends])
+
+        print(f"\n== {year} ({os.path.getsize(path)} bytes) ==")
+        print(f"{'backend':<12} {'parse ms':>10} {'extract ms':>12} {'total ms':>10}  identical")
+        results = {}
+        for backend in backends:
+            runs = [run_backend(url, path, backend, cache) for _ in range(args.repeat)]
+            results[backend] = (min(r[0] for r in runs) * 1000, min(r[1] for r in runs) * 1000, runs[0][2])
+
+        # html.parser 的输出作为基准
+        reference = results['html.parser'][2]
+        for backend, (parse_ms, extract_ms, digest) in results.items():
+            print(f"{backend:<12} {parse_ms:>10.1f} {extract_ms:>12.1f} {parse_ms + extract_ms:>10.1f}  "
+                  f"{digest == reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config.config import headers, years as default_years, solicitation_base_url, bench_dir
+from generate_prompts import generate_json_prompt
+from utils.http_client import HttpClient
+from utils.http_utils import extract_text_from_url
+from utils.link_utils import extract_all_links
+from utils.page import load_page
+from utils.structure_utils import extract_structured_content
+
+# 按顺序运行的阶段；prompts 读取 links 和 text 阶段写出的文件
+STAGES = ('links', 'structured', 'text', 'prompts')
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, None where the resource module is missing (Windows)."""
+    if importlib.util.find_spec('resource') is None:
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def git_revision():
+    repo = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True, text=True,
+                                check=True).stdout
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.strip(), bool(status.strip())
+
+
+def run_stage(stage, year, url, snapshot, work_dir, replay=None, fetch_pages=False, parser=None, verbose=False):
+    """
+    Run one stage for one year and measure it; called in a fresh process so the
+    peak RSS belongs to this stage alone.
+
+    The page comes from the saved snapshot (and is parsed inside the timed part),
+    or is fetched through the client with ``fetch_pages``. No probe cache is used,
+    so every link probe is an HTTP request.
+    """
+    client = HttpClient(replay=replay)
+    page = None if fetch_pages else load_page(url, snapshot, parser=parser)
+    links_path = os.path.join(work_dir, f"links_{year}.json")
+    text_path = os.path.join(work_dir, f"text_{year}.txt")
+    baseline_rss = peak_rss_bytes()
+    before = client.stats()
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        start = time.perf_counter()
+        if stage == 'links':
+            result = extract_all_links(url, headers, client=client, page=page)
+            count = len(result)
+        elif stage == 'structured':
+            result, link_stats = extract_structured_content(url, headers, client=client, page=page)
+            count = link_stats['link_occurrences']
+        elif stage == 'text':
+            result = extract_text_from_url(url, headers, client=client, page=page)
+            count = None
+        else:
+            result = generate_json_prompt(links_path, text_path, os.path.join(work_dir, f"prompt_{year}.json"))
+            count = len(result['data'])
+        elapsed = time.perf_counter() - start
+
+    after = client.stats()
+    client.close()
+
+    # 下游阶段的输入在计时之外写出
+    if stage == 'links':
+        with open(links_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    elif stage == 'text':
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(result)
+
+    # 未录制的请求由回放服务以带 X-Replay-Miss 的 404 应答，客户端按响应头计数
+    replay_misses = after['replay']['misses'] - before['replay']['misses'] if 'replay' in after else None
+
+    return {
+        'wall_s': round(elapsed, 4),
+        'requests': after['requests'] - before['requests'],
+        'replay_misses': replay_misses,
+        'bytes_downloaded': after['bytes_downloaded'] - before['bytes_downloaded'],
+        'connections_opened': after['connections_opened'] - before['connections_opened'],
+        'peak_rss_bytes': peak_rss_bytes(),
+        'baseline_rss_bytes': baseline_rss,
+        'links': count,
+        'links_per_s': round(count / elapsed, 1) if count is not None and elapsed > 0 else None,
+    }
+
+
+def run_isolated(*args):
+    # 每个阶段在新启动（spawn）的进程中运行，峰值内存互不影响
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_stage, *args).result()
+
+
+def summarize(runs):
+    """Median wall time over the repeats; counters from the last run, the highest peak RSS."""
+    walls = [run['wall_s'] for run in runs]
+    summary = dict(runs[-1])
+    summary['wall_s'] = round(statistics.median(walls), 4)
+    summary['wall_s_runs'] = walls
+    rss = [run['peak_rss_bytes'] for run in runs if run['peak_rss_bytes'] is not None]
+    summary['peak_rss_bytes'] = max(rss) if rss else None
+    if summary['links'] is not None and summary['wall_s'] > 0:
+        summary['links_per_s'] = round(summary['links'] / summary['wall_s'], 1)
+    return summary
+
+
+def stage_totals(results):
+    """Per-stage totals over all years."""
+    totals = {}
+    for stage in STAGES:
+        rows = [by_stage[stage] for by_stage in results.values() if stage in by_stage]
+        if not rows:
+            continue
+        wall = sum(row['wall_s'] for row in rows)
+        counts = [row['links'] for row in rows if row['links'] is not None]
+        rss = [row['peak_rss_bytes'] for row in rows if row['peak_rss_bytes'] is not None]
+        totals[stage] = {
+            'wall_s': round(wall, 4),
+            'requests': sum(row['requests'] for row in rows),
+            'bytes_downloaded': sum(row['bytes_downloaded'] for row in rows),
+            'peak_rss_bytes': max(rss) if rss else None,
+            'links': sum(counts) if counts else None,
+            'links_per_s': round(sum(counts) / wall, 1) if counts and wall > 0 else None,
+            'replay_misses': sum(row.get('replay_misses') or 0 for row in rows),
+        }
+    return totals
+
+
+def megabytes(value):
+    return f"{value / 1024 / 1024:.1f}" if value is not None else '-'
+
+
+def print_totals(totals):
+    print(f"{'stage':<12} {'wall s':>8} {'requests':>9} {'bytes':>11} {'peak RSS MB':>12} {'links':>7} "
+          f"{'links/s':>9}")
+    for stage, row in totals.items():
+        links = row['links'] if row['links'] is not None else '-'
+        rate = f"{row['links_per_s']:,.1f}" if row['links_per_s'] is not None else '-'
+        print(f"{stage:<12} {row['wall_s']:>8.3f} {row['requests']:>9} {row['bytes_downloaded']:>11,} "
+              f"{megabytes(row['peak_rss_bytes']):>12} {links:>7} {rate:>9}")
+
+
+def print_comparison(old, new):
+    """Per-stage change between two result files; positive percentages are slower / larger."""
+    def revision(results):
+        meta = results['meta']
+        return f"{(meta.get('commit') or '?')[:12]}{' (dirty)' if meta.get('dirty') else ''}"
+
+    print(f"\n== {revision(old)} -> {revision(new)} ==")
+    for label, results in (('old', old), ('new', new)):
+        if not results['meta'].get('comparable', True):
+            print(f"[Warning] the {label} run hit the live site, its timings are not comparable")
+    print(f"{'stage':<12} {'old s':>8} {'new s':>8} {'wall':>8} {'requests':>12} {'bytes':>18} {'peak RSS MB':>14}")
+
+    def change(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else '-'
+
+    for stage in STAGES:
+        a, b = old['stages'].get(stage), new['stages'].get(stage)
+        if not a or not b:
+            continue
+        print(f"{stage:<12} {a['wall_s']:>8.3f} {b['wall_s']:>8.3f} {change(a['wall_s'], b['wall_s']):>8} "
+              f"{a['requests']:>5} -> {b['requests']:<4} {a['bytes_downloaded']:>8} -> {b['bytes_downloaded']:<8}"
+              f"{megabytes(a['peak_rss_bytes']):>6} -> {megabytes(b['peak_rss_bytes']):<6}")
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the extraction stages on saved pages against a local HTTP stand-in")
+    parser.add_argument('--years', type=int, nargs='+', default=default_years)
+    parser.add_argument('--snaps-dir', default='data/snaps')
+    parser.add_argument('--base-url', default=solicitation_base_url,
+                        help="solicitation page base URL the snapshots (and the archive) were taken from")
+    parser.add_argument('--replay', default=os.environ.get('HTTP_REPLAY'),
+                        help="recorded HTTP archive or replay server URL (default: $HTTP_REPLAY); "
+                             "required unless --live is given")
+    parser.add_argument('--live', action='store_true',
+                        help="run the stages against the live site; the results are marked as not comparable")
+    parser.add_argument('--latency', type=float, default=None, help="replay latency in seconds")
+    parser.add_argument('--jitter', type=float, default=None, help="relative replay latency jitter")
+    parser.add_argument('--bandwidth', type=int, default=None, help="replay bytes per second per response")
+    parser.add_argument('--fetch-pages', action='store_true', help="fetch the pages over HTTP instead of the snapshots")
+    parser.add_argument('--parser', default=None, help="HTML parser backend, see utils.html_parser")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage, the median wall time is reported")
+    parser.add_argument('--output', default=None, help=f"results file (default: {bench_dir}/pipeline-<commit>.json)")
+    parser.add_argument('--compare', nargs='+', metavar='RESULTS',
+                        help="compare this run with an earlier results file, or two results files without running")
+    parser.add_argument('--verbose', action='store_true', help="show the output of the stages")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        print_comparison(load_results(args.compare[0]), load_results(args.compare[1]))
+        return
+
+    if not args.replay and not args.live:
+        parser.error("give a recorded HTTP archive or replay server URL with --replay (or $HTTP_REPLAY), "
+                     "or --live to benchmark against the live site")
+
+    # 回放压缩包时在本进程启动一个回放服务，所有阶段进程共用它
+    server = None
+    replay = args.replay
+    if replay and not replay.startswith(('http://', 'https://')):
+        from utils.http_replay import serve
+        server = serve(replay, latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth)
+        replay = server.base_url
+        print(f"Replaying {args.replay} ({len(server.archive)} exchanges) at {replay}")
+    elif replay:
+        print(f"Replaying through {replay}")
+    else:
+        print("[Warning] Benchmarking against the live site, the results are marked as not comparable")
+
+    commit, dirty = git_revision()
+    output_path = args.output or os.path.join(bench_dir, f"pipeline-{(commit or time.strftime('%Y%m%d-%H%M%S'))[:12]}"
+                                                         f"{'-dirty' if dirty else ''}.json")
+    work_dir = os.path.join(os.path.dirname(output_path) or '.', 'work')
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = {}
+    for year in args.years:
+        snapshot = os.path.join(args.snaps_dir, f"{year}.html")
+        if not args.fetch_pages and not os.path.exists(snapshot):
+            print(f"[Skip] {snapshot} not found, run run_pipeline.py first")
+            continue
+
+        url = f"{args.base_url}{year}-Solicitation"
+        results[str(year)] = {}
+        for stage in STAGES:
+            runs = []
+            for _ in range(args.repeat):
+                runs.append(run_isolated(stage, year, url, snapshot, work_dir, replay, args.fetch_pages,
+                                         args.parser, args.verbose))
+            results[str(year)][stage] = summarize(runs)
+            print(f"{year} {stage:<12} {results[str(year)][stage]['wall_s']:.3f}s")
+
+    if server:
+        server.shutdown()
+
+    report = {
+        'format': 'pipeline-bench',
+        'version': 1,
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'years': args.years,
+            'repeat': args.repeat,
+            'pages': 'fetched' if args.fetch_pages else 'snapshots',
+            'parser': args.parser,
+            # 访问线上网站的计时受网络和对方服务器影响，不能与回放结果比较
+            'comparable': bool(args.replay),
+            'http': {
+                'mode': 'replay' if args.replay else 'live',
+                'source': args.replay,
+                'latency': server.latency if server else args.latency,
+                'jitter': server.jitter if server else args.jitter,
+                'bandwidth': server.bandwidth if server else args.bandwidth,
+            },
+        },
+        'stages': stage_totals(results),
+        'years': results,
+    }
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    print_totals(report['stages'])
+    misses = sum(row['replay_misses'] for row in report['stages'].values())
+    if misses:
+        print(f"[Warning] {misses} requests were not in the archive (404), record it again")
+    print(f"\nResults saved to {output_path}")
+
+    if args.compare:
+        print_comparison(load_results(args.compare[0]), report)
+
+
+if __name__ == "__main__":
+    main()
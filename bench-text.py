@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import random
+import re
+import time
+
+from utils.text_utils import (
+    clean_text, clean_text_preserve_paragraphs, sanitize_filename, clean_texts, clean_paragraph_texts,
+    sanitize_filenames,
+)
+
+
+# 改写前的实现，作为输出一致性和速度的基准
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = text.replace('\xa0', ' ')
+    text = text.replace('&nbsp;', ' ')
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    return text
+
+
+def legacy_clean_text_preserve_paragraphs(text):
+    if not text:
+        return ""
+    text = text.replace('\xa0', ' ')
+    text = text.replace('&nbsp;', ' ')
+    paragraphs = re.split(r'\n{2,}', text)
+    cleaned_paragraphs = []
+    for para in paragraphs:
+        para = re.sub(r'[ \t\r\f\v]+', ' ', para)
+        para = para.strip()
+        if para:
+            cleaned_paragraphs.append(para)
+    return '\n\n'.join(cleaned_paragraphs)
+
+
+def legacy_sanitize_filename(text):
+    if not text:
+        return ""
+    text = legacy_clean_text(text)
+    text = re.sub(r'[\\/*?:"<>|]', '_', text)
+    text = re.sub(r'[\s\.,;()]', '_', text)
+    text = re.sub(r'_+', '_', text)
+    text = text.strip('_')
+    if len(text) > 100:
+        text = text[:100]
+    if text.endswith('.'):
+        text = text[:-1]
+    if not text:
+        text = "unnamed_file"
+    return text
+
+
+FUNCTIONS = [
+    ('clean_text', legacy_clean_text, clean_text, clean_texts),
+    ('clean_text_preserve_paragraphs', legacy_clean_text_preserve_paragraphs, clean_text_preserve_paragraphs,
+     clean_paragraph_texts),
+    ('sanitize_filename', legacy_sanitize_filename, sanitize_filename, sanitize_filenames),
+]
+
+
+def structured_strings(structure):
+    """Paragraphs, link texts and table cells of a structured-content tree."""
+    for section in structure.values():
+        yield from section.get('paragraphs', [])
+        for link in section.get('links', []):
+            yield link.get('text') or ''
+        for table in section.get('tables', []):
+            for row in table:
+                yield from (value for value in row.values() if isinstance(value, str))
+        yield from structured_strings(section.get('subsections', {}))
+
+
+def snapshot_strings(path):
+    from utils.html_parser import parse_html
+    with open(path, 'rb') as f:
+        soup = parse_html(f.read())
+    yield from (link.text for link in soup.find_all('a'))
+    yield soup.get_text()
+
+
+def random_strings(count, seed=0):
+    # 各种空白（含 Unicode 空白和 \x1c-\x1f）、&nbsp;、文件名非法字符和非 ASCII 字符的随机组合
+    pieces = ['a', 'Offshore', 'Wind', '2018', ' ', '  ', '\t', '\n', '\n\n', '\n \n', '\r\n', '\xa0', '&nbsp;',
+              '&nbsp', ' ', '　', '\x1c', '\x85', ' ', '_', '__', '.', ',', ';', '(', ')', '/', '\\',
+              ':', '*', '?', '"', '<', '>', '|', '-', '[PDF]', 'é', '—', '☃']
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+    yield 'x' * 99 + '_y'
+    yield 'x' * 150
+    yield ''
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the text normalizers against the previous implementations")
+    parser.add_argument('--structured', nargs='*', default=['structured_content_test_2018.json'])
+    parser.add_argument('--years', type=int, nargs='*', default=[2018, 2020, 2022, 2023, 2024])
+    parser.add_argument('--snaps-dir', default='data/snaps')
+    parser.add_argument('--random', type=int, default=20000, help="number of random strings")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = []
+    for path in args.structured:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                corpus.extend(structured_strings(json.load(f)))
+    for year in args.years:
+        path = os.path.join(args.snaps_dir, f"{year}.html")
+        if os.path.exists(path):
+            corpus.extend(snapshot_strings(path))
+    pages = corpus
+    generated = list(random_strings(args.random))
+    print(f"{len(pages)} strings from pages, {len(generated)} random strings")
+
+    for label, strings in (('page strings', pages), ('random strings', generated)):
+        if not strings:
+            continue
+        print(f"\n== {label} ==")
+        print(f"{'function':<32} {'identical':>9} {'legacy str/s':>14} {'new str/s':>12} {'batch str/s':>13} "
+              f"{'speedup':>8}")
+        for name, legacy, new, batch in FUNCTIONS:
+            mismatches = [text for text in strings if legacy(text) != new(text)]
+            identical = not mismatches and batch(strings) == [legacy(text) for text in strings]
+
+            legacy_s = timed(lambda: [legacy(text) for text in strings], args.repeat)
+            new_s = timed(lambda: [new(text) for text in strings], args.repeat)
+            batch_s = timed(lambda: batch(strings), args.repeat)
+            print(f"{name:<32} {str(identical):>9} {len(strings) / legacy_s:>14,.0f} {len(strings) / new_s:>12,.0f} "
+                  f"{len(strings) / batch_s:>13,.0f} {legacy_s / min(new_s, batch_s):>7.1f}x")
+            for text in mismatches[:3]:
+                print(f"  mismatch: {text!r}: {legacy(text)!r} != {new(text)!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from config.config import batch_requests_path, batch_results_path
+from utils.json_utils import iter_jsonl, write_jsonl
+from utils.llm_client import LLMClient, run_batch_requests
+from utils.llm_stub import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send the batch requests to an OpenAI-compatible endpoint concurrently")
+    parser.add_argument('--requests', default=batch_requests_path, help="batch requests JSONL from generate_prompts.py")
+    parser.add_argument('--output', default=batch_results_path, help="results JSONL, read by join-batch-results.py")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--model', default=None)
+    parser.add_argument('--concurrency', type=int, default=None, help="maximum requests in flight")
+    parser.add_argument('--rpm', type=int, default=None, help="requests per minute")
+    parser.add_argument('--tpm', type=int, default=None, help="prompt tokens per minute")
+    parser.add_argument('--stub', action='store_true', help="start the local stand-in server and send to it")
+    parser.add_argument('--stub-latency', type=float, default=0.5)
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if args.stub:
+        stub = serve(latency=args.stub_latency)
+        base_url = stub.base_url
+        print(f"Using stub server at {base_url}")
+
+    llm = LLMClient(base_url=base_url, model=args.model, max_in_flight=args.concurrency,
+                    requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+
+    start = time.perf_counter()
+    count = write_jsonl(run_batch_requests(iter_jsonl(args.requests), llm), args.output)
+    elapsed = time.perf_counter() - start
+
+    stats = llm.stats()
+    print(f"{count} requests answered in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.2f} req/s)")
+    print(f"LLM: {stats}")
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
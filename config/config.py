@@ -1,6 +1,97 @@
+import os
+
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.5",
     "Referer": "https://portal.nyserda.ny.gov"
-}
\ No newline at end of file
+}
+
+# 并发探测链接时的最大线程数
+max_workers = 8
+
+# 默认请求超时（秒）
+request_timeout = 20
+
+# 探测文件类型时最多读取的字节数（Range: bytes=0-1023）
+sniff_bytes = 1024
+
+# 区分 docx/xlsx/pptx、doc/xls/ppt 时的范围读取上限：ZIP 尾部字节数、中央目录最大字节数
+container_tail_bytes = 16 * 1024
+container_directory_max_bytes = 256 * 1024
+
+# 门户下载中间页最多读取的字节数
+interstitial_max_bytes = 64 * 1024
+
+# 链接探测结果的磁盘缓存：路径、有效期（秒）、最大条目数
+probe_cache_path = 'data/cache/probe_cache.sqlite'
+probe_cache_ttl = 7 * 24 * 3600
+probe_cache_max_entries = 50000
+
+# HTML 解析器后端：None 表示自动选择（已安装 lxml 时使用 lxml，否则 html.parser）
+html_parser = None
+
+# 需要处理的招标年份及页面地址
+years = [2018, 2020, 2022, 2023, 2024]
+solicitation_base_url = 'https://www.nyserda.ny.gov/All-Programs/Offshore-Wind/Focus-Areas/Offshore-Wind-Solicitations/'
+
+# 文档下载：内容寻址存储目录、流式写入块大小、每个主机的最大并发下载数、需要下载的文件类型
+file_store_dir = 'data/files'
+download_chunk_bytes = 64 * 1024
+download_per_host = 4
+downloadable_types = ['pdf', 'docx', 'xlsx', 'pptx', 'doc', 'xls', 'ppt', 'zip', 'rtf', 'zip/docx/xlsx', 'doc/xls']
+
+# 分批提示词：每个提示词的 token 上限、参考文本最多占用的 token 数、计数方式（'bytes' 估算或 'tiktoken[:<encoding>]'）
+prompt_max_tokens = 8000
+prompt_reference_max_tokens = 3000
+prompt_tokenizer = 'bytes'
+bytes_per_token = 4
+# 服务端提示词缓存的最短前缀（OpenAI 为 1024 tokens），用于估算可命中缓存的 token 数
+prompt_cache_min_tokens = 1024
+
+# 批量 API：模型、请求的接口路径、请求文件 / 结果文件 / 合并结果的路径
+llm_model = 'gpt-4o-mini'
+batch_endpoint = '/v1/chat/completions'
+batch_requests_path = 'data/batch/requests.jsonl'
+batch_results_path = 'data/batch/results.jsonl'
+batch_joined_path = 'data/batch/classified.jsonl'
+
+# LLM 分类接口（OpenAI 兼容）：地址、密钥、最大并发请求数、每分钟请求数 / token 数上限、重试次数与退避（秒）、超时
+llm_base_url = os.environ.get('LLM_BASE_URL', 'https://api.openai.com/v1')
+llm_api_key = os.environ.get('OPENAI_API_KEY')
+llm_max_in_flight = 8
+llm_requests_per_minute = 500
+llm_tokens_per_minute = 200000
+llm_max_retries = 5
+llm_backoff_base = 1.0
+llm_backoff_max = 30.0
+llm_timeout = 120
+
+# LLM 分类结果缓存：路径、最大条目数、最大字节数、命中率统计输出路径
+llm_cache_path = 'data/cache/llm_cache.sqlite'
+llm_cache_max_entries = 200000
+llm_cache_max_bytes = 64 * 1024 * 1024
+llm_cache_stats_path = 'data/batch/cache_stats.json'
+
+# 规则预分类：置信度不低于该阈值的文档不再发送给 LLM
+rule_confidence_threshold = 0.8
+
+# 链接记录导出：输出目录、格式（None 表示自动选择：已安装 pyarrow 用 parquet，其次 msgpack，否则标准库的列式 JSON）、每块行数
+export_dir = 'data/export'
+export_format = None
+export_chunk_rows = 64 * 1024
+
+# HTTP 录制 / 回放（用于离线、可复现的基准测试）：
+# HTTP_RECORD=<archive.zip> 时把经 get_client() 发出的请求和响应录入压缩包；
+# HTTP_REPLAY=<archive.zip> 时在本进程启动回放服务，HTTP_REPLAY=http://host:port 时使用已启动的回放服务
+http_record_path = os.environ.get('HTTP_RECORD')
+http_replay = os.environ.get('HTTP_REPLAY')
+# 录制时每个响应最多保存的正文字节数（超出部分截断，回放时按原 Content-Length 发送后断开连接）
+http_record_max_body_bytes = 4 * 1024 * 1024
+# 本进程回放服务注入的延迟（秒）、抖动比例、每个响应的带宽（字节/秒，0 表示不限速）
+http_replay_latency = 0.05
+http_replay_jitter = 0.0
+http_replay_bandwidth = 0
+
+# 端到端基准测试（bench-pipeline.py）的结果目录，每次运行保存一个 JSON 文件
+bench_dir = 'data/bench'
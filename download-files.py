@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import time
+
+from config.config import headers, years as default_years, downloadable_types
+from utils.blob_store import BlobStore, download_links
+from utils.http_client import get_client
+
+
+def load_links(years, links_dir, file_types):
+    links = []
+    for year in years:
+        path = os.path.join(links_dir, f"extracted_links_{year}.json")
+        if not os.path.exists(path):
+            print(f"[Skip] {path} not found, run run_pipeline.py first")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            links.extend(link for link in json.load(f) if link['file_type'] in file_types)
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the linked documents into a content-addressed store")
+    parser.add_argument('--years', type=int, nargs='+', default=default_years)
+    parser.add_argument('--links-dir', default='data/document_info')
+    parser.add_argument('--store', default=None, help="store directory, defaults to config.file_store_dir")
+    parser.add_argument('--types', nargs='+', default=downloadable_types)
+    parser.add_argument('--jobs', type=int, default=None, help="concurrent downloads")
+    parser.add_argument('--per-host', type=int, default=None, help="concurrent downloads per host")
+    args = parser.parse_args()
+
+    links = load_links(args.years, args.links_dir, set(args.types))
+    store = BlobStore(args.store)
+    client = get_client()
+
+    start = time.perf_counter()
+    results = download_links(links, store, headers, client, max_workers=args.jobs, per_host=args.per_host)
+    elapsed = time.perf_counter() - start
+
+    print(f"Links: {len(links)}, distinct URLs: {len(results)}, "
+          f"blobs in index: {len({e['sha256'] for e in store.index['urls'].values()})}")
+    print(f"Store: {store.stats}")
+    print(f"HTTP: {client.stats()}")
+    print(f"Index written to {store.index_path} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import glob
+import json
+import os
+
+from config.config import years as default_years
+from utils.export_utils import available_formats, export_path, iter_section_links, resolve_format, write_links
+from utils.json_utils import iter_json_array
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export link records to a compact columnar / binary format")
+    parser.add_argument('--years', type=int, nargs='+', default=default_years)
+    parser.add_argument('--structured', nargs='*', default=None,
+                        help="structured content JSON files (default: structured_content_test_*.json)")
+    parser.add_argument('--format', default=None, choices=available_formats())
+    parser.add_argument('--output-dir', default=None)
+    args = parser.parse_args()
+
+    fmt = resolve_format(args.format)
+    print(f"Export format: {fmt}")
+
+    for year in args.years:
+        input_path = f'data/document_info/extracted_links_{year}.json'
+        if not os.path.exists(input_path):
+            print(f"[Skip] {input_path} not found")
+            continue
+        output_path = export_path(f"links_{year}", fmt, args.output_dir)
+        count = write_links(iter_json_array(input_path), output_path, fmt)
+        print(f"{input_path}: {count} links -> {output_path} "
+              f"({os.path.getsize(input_path)} -> {os.path.getsize(output_path)} bytes)")
+
+    structured_paths = args.structured if args.structured is not None else sorted(glob.glob('structured_content_test_*.json'))
+    for input_path in structured_paths:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            structure = json.load(f)
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = export_path(f"{name}_links", fmt, args.output_dir)
+        count = write_links(iter_section_links(structure), output_path, fmt)
+        print(f"{input_path}: {count} links -> {output_path} ({os.path.getsize(output_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,4 @@
-import requests
-import re
-import os
-from urllib.parse import urljoin, urlparse, unquote
 import json
-from bs4 import BeautifulSoup, Tag
 
 # Headers for the HTTP requests
 headers = {
@@ -13,194 +8,26 @@ headers = {
     "Referer": "https://portal.nyserda.ny.gov"
 }
 
-# Import the process_link function from utils.http_utils
-from utils.http_utils import process_link, download_snapshot
-from utils.text_utils import clean_text
-
-
-
-def sanitize_filename(text):
-    """Convert text to a safe filename format."""
-    if not text:
-        return ""
-
-    # First, clean basic whitespace issues
-    text = clean_text(text)
-
-    # Replace characters that are invalid in filenames with underscores
-    # Windows/Unix invalid filename chars: / \ : * ? " < > | and control chars
-    text = re.sub(r'[\\/*?:"<>|]', '_', text)
-
-    # Replace spaces, periods, commas, semicolons, and parentheses with underscores
-    text = re.sub(r'[\s\.,;()]', '_', text)
-
-    # Replace multiple underscores with a single underscore
-    text = re.sub(r'_+', '_', text)
-
-    # Trim underscores from start and end
-    text = text.strip('_')
-
-    # Truncate to reasonable length for a filename (max 100 chars)
-    if len(text) > 100:
-        text = text[:100]
-
-    # Make sure we don't end with a period (problematic for Windows)
-    if text.endswith('.'):
-        text = text[:-1]
-
-    # If nothing left after sanitizing, return a default
-    if not text:
-        text = "unnamed_file"
-
-    return text
-
-
-def extract_filename_from_url(url):
-    """Extract the filename from a URL, if present."""
-    if not url:
-        return None
-
-    # Parse the URL
-    parsed_url = urlparse(url)
-    # Get the path component
-    path = parsed_url.path
-
-    # URL decode the path (handles %20 spaces, etc.)
-    path = unquote(path)
-
-    # Split the path by '/' and get the last component
-    path_parts = path.split('/')
-    last_part = path_parts[-1] if path_parts else ""
-
-    # If the last part has a file extension or looks like a filename, return it
-    if last_part and ('.' in last_part or re.search(r'[a-zA-Z0-9_-]+$', last_part)):
-        # Remove any query string or fragment
-        filename = last_part.split('?')[0].split('#')[0]
-        # Clean the filename for use as an actual filename
-        filename = sanitize_filename(filename)
-        return filename
-
-    # If no obvious filename is found
-    return None
-
-
-def extract_all_links(url, headers=None):
-    """Extract all links from a webpage, excluding those with unknown file types."""
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise exception for HTTP errors
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        all_links = []
-        unique_urls = set()  # To avoid processing the same URL multiple times
-
-        # Find all anchor tags with href attribute
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            # Get and clean the link text
-            raw_text = clean_text(link.text)
-            # Also create a filename-safe version of the text
-            safe_text = sanitize_filename(link.text)
-
-            # Skip empty or javascript links
-            if not href or href.startswith('javascript:') or href == '#':
-                continue
-
-            # Create absolute URL
-            absolute_url = urljoin(url, href)
-
-            # Skip if we've already processed this URL
-            if absolute_url in unique_urls:
-                continue
-
-            unique_urls.add(absolute_url)
-
-            # Use the imported process_link function to get detailed information
-            link_data = process_link(href, raw_text, headers, url)
-
-            # Add the filename-safe version of the text
-            link_data["safe_text"] = safe_text
-
-            # Extract filename from URL
-            filename = extract_filename_from_url(link_data["file_url"])
-            link_data["filename"] = filename
-
-            # Only include links with known file types
-            if link_data["file_type"] != "unknown":
-                all_links.append(link_data)
-
-        return all_links
-
-    except Exception as e:
-        print(f"Error extracting links from {url}: {str(e)}")
-        return []
-
-
-def extract_links_from_tables(url, headers=None):
-    """Extract links specifically from tables in the webpage, excluding those with unknown file types."""
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        table_links = []
-        unique_urls = set()
-
-        # Find all tables
-        tables = soup.find_all('table')
-        for table in tables:
-            # Find all links within the table
-            for link in table.find_all('a', href=True):
-                href = link.get('href')
-                # Get and clean the link text
-                raw_text = clean_text(link.text)
-                # Also create a filename-safe version of the text
-                safe_text = sanitize_filename(link.text)
-
-                # Skip empty or javascript links
-                if not href or href.startswith('javascript:') or href == '#':
-                    continue
-
-                # Create absolute URL
-                absolute_url = urljoin(url, href)
-
-                # Skip if we've already processed this URL
-                if absolute_url in unique_urls:
-                    continue
-
-                unique_urls.add(absolute_url)
-
-                # Process the link
-                link_data = process_link(href, raw_text, headers, url)
-
-                # Add the filename-safe version of the text
-                link_data["safe_text"] = safe_text
-
-                # Extract filename from URL
-                filename = extract_filename_from_url(link_data["file_url"])
-                link_data["filename"] = filename
-
-                # Only include links with known file types
-                if link_data["file_type"] != "unknown":
-                    # Add a flag to indicate this link was found in a table
-                    link_data["in_table"] = True
-                    table_links.append(link_data)
-
-        return table_links
-
-    except Exception as e:
-        print(f"Error extracting table links from {url}: {str(e)}")
-        return []
+# Link extraction lives in utils.link_utils so the pipeline can share it
+from utils.http_client import get_client
+from utils.link_utils import extract_all_links
+from utils.page import fetch_page
+from utils.probe_cache import ProbeCache
 
 
 def main():
     target_url = 'https://www.nyserda.ny.gov/All-Programs/Offshore-Wind/Focus-Areas/Offshore-Wind-Solicitations/2018-Solicitation'
-    download_snapshot(target_url, "data/snaps", "2018.html")
+    # Fetch the page once; the snapshot and the link extractor share the same bytes
+    page = fetch_page(target_url, headers)
+    page.save_snapshot("data/snaps", "2018.html")
 
     print(f"Extracting links from: {target_url}")
 
+    # Probe results are cached on disk, so re-runs only revalidate changed documents
+    cache = ProbeCache()
+
     # Extract all links from the webpage (excluding unknown file types)
-    all_links = extract_all_links(target_url, headers)
+    all_links = extract_all_links(target_url, headers, cache=cache, page=page)
 
     # Optional: Extract links specifically from tables
     # table_links = extract_links_from_tables(target_url, headers)
@@ -239,6 +66,14 @@ def main():
 
     print(f"\nLinks data saved to {output_file}")
 
+    stats = get_client().stats()
+    print(f"HTTP requests: {stats['requests']}, connections opened: {stats['connections_opened']}, "
+          f"reused: {stats['connections_reused']}, bytes downloaded: {stats['bytes_downloaded']}")
+    cache_stats = cache.stats()
+    print(f"Probe cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+          f"{cache_stats['misses']} misses ({cache_stats['entries']} entries)")
+    cache.close()
+
     # Print some example links
     print("\nExample links with filenames:")
     examples_shown = 0
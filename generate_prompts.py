@@ -1,7 +1,12 @@
 import os
 import json
 
-from utils.json_utils import extract_fields_from_json
+from config.config import years, batch_requests_path, llm_cache_stats_path, prompt_cache_min_tokens
+from utils.batch_utils import batch_request
+from utils.json_utils import extract_fields_from_json, iter_json_array, write_jsonl
+from utils.llm_cache import ResponseCache
+from utils.prompt_utils import build_prompt_batches, iter_prompt_batches, shared_reference
+from utils.rule_classifier import RuleClassifier
 
 
 def generate_string_prompts(input_path_json, input_path_content, output_path=None):
@@ -111,14 +116,111 @@ def generate_json_prompt(input_path_json, input_path_content, output_path=None):
     return json_prompt
 
 
+def generate_batched_prompts(input_path_json, input_path_content, year, output_path=None, max_tokens=None,
+                             tokenizer=None, shared=None):
+    """
+    Split the year's documents into prompts that each fit the token budget; items carry stable ids.
+
+    ``shared`` is the reference boilerplate common to all years (see
+    utils.prompt_utils.shared_reference), placed once before the year's own part.
+    """
+    with open(input_path_json, 'r', encoding='utf-8') as f:
+        links = json.load(f)
+
+    with open(input_path_content, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    batches = build_prompt_batches(links, content, year, max_tokens=max_tokens, tokenizer=tokenizer, shared=shared)
+    print(f"{year}: {len(links)} documents in {len(batches)} prompts "
+          f"(max {max((b['tokens'] for b in batches), default=0)} tokens, "
+          f"{batches[0]['prefix_tokens'] if batches else 0} shared prefix)")
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'year': year, 'batches': batches}, f, indent=2, ensure_ascii=False)
+        print(f"Prompts saved to {output_path}")
+    else:
+        print("No output path provided. Prompts not saved.")
+
+    return batches
+
+
+def write_batch_requests(years, output_path=batch_requests_path, model=None, max_tokens=None, tokenizer=None,
+                         cache=None, pre_classifier=None):
+    """
+    Stream one batch-API request line per prompt batch, for all years, into a JSONL file.
+
+    Link files are read element by element and each batch is written as soon as
+    it is full, so memory does not grow with the number of documents. Documents
+    with an answer in ``cache`` (a ResponseCache) are not sent again, nor are
+    documents the ``pre_classifier`` (a RuleClassifier) answers confidently.
+
+    Prompts are laid out for provider-side prompt caching: the instruction and the
+    reference lines common to all years come first, then the year's own reference,
+    then the documents. The report counts the prompt tokens that repeat an earlier
+    request's prefix of at least ``prompt_cache_min_tokens`` (cache hits at best).
+    """
+    references = {}
+    for year in years:
+        with open(f'data/html_content/{year}.txt', 'r', encoding='utf-8') as f:
+            references[year] = f.read()
+    shared = shared_reference(references.values())
+    totals = {}
+    prefix = {'prompt_tokens': 0, 'cacheable_tokens': 0}
+
+    def requests():
+        shared_seen = False
+        for year in years:
+            links = iter_json_array(f'data/document_info/extracted_links_{year}.json')
+            stats = {}
+            year_seen = False
+            for batch in iter_prompt_batches(links, references[year], year, max_tokens=max_tokens,
+                                             tokenizer=tokenizer, cache=cache, model=model,
+                                             pre_classifier=pre_classifier, stats=stats, shared=shared):
+                # 同一年第一批之后可复用整个前缀；其他年份第一批只能复用共享部分
+                reusable = batch['prefix_tokens'] if year_seen else batch['shared_prefix_tokens'] if shared_seen else 0
+                prefix['prompt_tokens'] += batch['tokens']
+                prefix['cacheable_tokens'] += reusable if reusable >= prompt_cache_min_tokens else 0
+                shared_seen = year_seen = True
+                yield batch_request(batch, model)
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0) + value
+
+    count = write_jsonl(requests(), output_path)
+    print(f"{count} batch requests saved to {output_path}")
+    if totals.get('items'):
+        print(f"{totals['items']} documents: {totals['sent']} sent, {totals['rules']} answered by rules, "
+              f"{totals['cached']} cached; ~{totals['tokens_saved']} prompt tokens saved "
+              f"({totals['tokens_sent']} sent)")
+    if prefix['prompt_tokens']:
+        print(f"Shared reference: {len(shared.splitlines())} lines; ~{prefix['cacheable_tokens']} of "
+              f"{prefix['prompt_tokens']} prompt tokens repeat a cacheable prefix "
+              f"({prefix['cacheable_tokens'] / prefix['prompt_tokens']:.0%})")
+    if cache is not None:
+        print(f"Answer cache: {cache.stats()}")
+        cache.export_stats(llm_cache_stats_path)
+    return count
+
+
 def main():
-    years = [2018, 2020, 2022, 2023, 2024]
+    references = []
+    for year in years:
+        with open(f'data/html_content/{year}.txt', 'r', encoding='utf-8') as f:
+            references.append(f.read())
+    shared = shared_reference(references)
+
     for year in years:
         input_path_json = f'data/document_info/extracted_links_{year}.json'
         input_path_content = f'data/html_content/{year}.txt'
         output_path = f"data/prompts/{year}.txt"
         generate_string_prompts(input_path_json, input_path_content, output_path=output_path)
         generate_json_prompt(input_path_json, input_path_content, output_path=f"data/prompts/{year}.json")
+        generate_batched_prompts(input_path_json, input_path_content, year,
+                                 output_path=f"data/prompts/{year}.batches.json", shared=shared)
+    cache = ResponseCache()
+    write_batch_requests(years, cache=cache, pre_classifier=RuleClassifier())
+    cache.close()
 
 
 if __name__ == "__main__":
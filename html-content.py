@@ -1,7 +1,7 @@
 import os
 
 from utils.http_utils import extract_text_from_url
-from config.config import headers
+from config.config import headers, years, solicitation_base_url
 from utils.text_utils import clean_text_preserve_paragraphs
 
 
@@ -16,15 +16,9 @@ def save_html_content(url, output_path):
 
 
 def main():
-
-    years = [2018, 2020, 2022, 2023, 2024]
-
-    base_url = 'https://www.nyserda.ny.gov/All-Programs/Offshore-Wind/Focus-Areas/Offshore-Wind-Solicitations/'
-
-    urls = [f"{base_url}{year}-Solicitation" for year in years]
-
+    # 所有年份并发执行的完整流程见 run_pipeline.py
     for year in years:
-        url = f"{base_url}{year}-Solicitation"
+        url = f"{solicitation_base_url}{year}-Solicitation"
         output_path = f"data/html_content/{year}.txt"
         save_html_content(url, output_path)
 
@@ -1,37 +1,30 @@
-import requests
-import re
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup, Tag
 import json
 
+from utils.http_client import get_client
+from utils.http_utils import sniff_url, scan_redirect
 
-# 判断是否是 PDF 文件并处理重定向
+
+# 判断是否是 PDF 文件并处理重定向（只读取文件前缀，不下载完整文档）
 def is_pdf_file(url, headers=None, base_url=None):
     try:
         # 如果 URL 是相对路径，拼接成完整 URL
         if base_url:
             url = urljoin(base_url, url)
 
-        # 发送请求获取内容
-        response = requests.get(url, headers=headers, timeout=20, stream=True)
-        response.raise_for_status()
-        content = response.content
-
         # 首先检查是否是 PDF 文件
-        if content[:5] == b'%PDF-':
+        if sniff_url(url, headers)['content'][:5] == b'%PDF-':
             return url
 
         # 如果不是 PDF，尝试查找重定向 URL
-        match = re.search(r"window\.parent\.location\.href='(.*?)';", content.decode("utf-8", errors="ignore"))
-        if match:
-            redirected_pdf_url = urljoin(url, match.group(1))  # 拼接完整的 URL
-            with requests.get(redirected_pdf_url, headers=headers, stream=True, timeout=20) as pdf_resp:
-                pdf_resp.raise_for_status()
-                content = pdf_resp.content
-                if content[:5] == b'%PDF-':
-                    return redirected_pdf_url
-                else:
-                    raise ValueError("重定向后仍不是有效 PDF")
+        _, target, _ = scan_redirect(url, headers)
+        if target:
+            redirected_pdf_url = urljoin(url, target)  # 拼接完整的 URL
+            if sniff_url(redirected_pdf_url, headers)['content'][:5] == b'%PDF-':
+                return redirected_pdf_url
+            else:
+                raise ValueError("重定向后仍不是有效 PDF")
         else:
             raise ValueError("不是 PDF 且未检测到跳转链接")
 
@@ -175,7 +168,7 @@ def get_or_create_section(structured_data, path, link_stats):
 
 # 主函数：结构化提取网页内容
 def extract_structured_content(url, headers=None):
-    response = requests.get(url, headers=headers)
+    response = get_client().get(url, headers=headers)
     soup = BeautifulSoup(response.text, 'html.parser')
 
     structured_data = {}
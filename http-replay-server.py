@@ -0,0 +1,32 @@
+import argparse
+import time
+
+from config.config import http_replay_latency, http_replay_jitter, http_replay_bandwidth
+from utils.http_replay import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded HTTP responses (HTTP_RECORD archive) for offline runs")
+    parser.add_argument('archive', help="zip archive written with HTTP_RECORD=<path>")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=http_replay_latency, help="seconds before each response")
+    parser.add_argument('--jitter', type=float, default=http_replay_jitter, help="relative random spread of the latency")
+    parser.add_argument('--bandwidth', type=int, default=http_replay_bandwidth,
+                        help="bytes per second per response, 0 for unlimited")
+    args = parser.parse_args()
+
+    server = serve(args.archive, args.host, args.port, latency=args.latency, jitter=args.jitter,
+                   bandwidth=args.bandwidth)
+    print(f"Replaying {len(server.archive)} recorded responses on {server.base_url} (Ctrl+C to stop)")
+    print(f"Run scripts with HTTP_REPLAY={server.base_url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Requests so far: {server.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+from collections import Counter
+
+from config.config import years as default_years, batch_results_path, batch_joined_path
+from utils.batch_utils import iter_joined_links
+from utils.json_utils import write_jsonl
+from utils.llm_cache import ResponseCache
+from utils.rule_classifier import RuleClassifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join batch-API classification results back onto the link records")
+    parser.add_argument('--years', type=int, nargs='+', default=default_years)
+    parser.add_argument('--results', default=batch_results_path, help="batch results JSONL downloaded from the provider")
+    parser.add_argument('--output', default=batch_joined_path)
+    parser.add_argument('--model', default=None, help="model the prompts were built for (answer cache key)")
+    parser.add_argument('--no-cache', action='store_true', help="do not store or reuse answers in the answer cache")
+    parser.add_argument('--no-rules', action='store_true',
+                        help="do not fill in rule-based answers (use when the requests were built without rules)")
+    args = parser.parse_args()
+
+    links_paths = {year: f'data/document_info/extracted_links_{year}.json' for year in args.years}
+    cache = None if args.no_cache else ResponseCache()
+    references = {}
+    if cache is not None:
+        for year in args.years:
+            with open(f'data/html_content/{year}.txt', 'r', encoding='utf-8') as f:
+                references[year] = f.read()
+    pre_classifier = None if args.no_rules else RuleClassifier()
+    categories = Counter()
+    sources = Counter()
+
+    def joined():
+        for link in iter_joined_links(args.results, links_paths, cache=cache, references=references,
+                                      model=args.model, pre_classifier=pre_classifier):
+            categories[link['category']] += 1
+            sources[link['custom_id'] if link['custom_id'] in ('cache', 'rules', None) else 'llm'] += 1
+            yield link
+
+    count = write_jsonl(joined(), args.output)
+    print(f"{count} documents written to {args.output}")
+    for category, n in categories.most_common():
+        print(f"  {category or '(no answer)'}: {n}")
+    print(f"Answer sources: {dict(sources)}")
+    if cache is not None:
+        print(f"Answer cache: {cache.stats()}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import time
+
+from utils.llm_stub import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server for offline classification runs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.5, help="base seconds per request")
+    parser.add_argument('--latency-per-1k-tokens', type=float, default=0.0, help="extra seconds per 1000 tokens")
+    parser.add_argument('--jitter', type=float, default=0.2, help="relative random spread of the delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument('--no-prompt-cache', action='store_true', help="do not simulate provider prompt caching")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, latency=args.latency, latency_per_1k_tokens=args.latency_per_1k_tokens,
+                   jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                   prompt_cache=not args.no_prompt_cache)
+    print(f"Stub LLM server listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Requests so far: {server.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config.config import headers, years as default_years, solicitation_base_url, max_workers
+from generate_prompts import generate_string_prompts, generate_json_prompt, generate_batched_prompts
+from utils.http_client import get_client
+from utils.http_utils import LinkProber
+from utils.link_utils import known_type_links
+from utils.manifest import Manifest, hash_bytes, hash_files
+from utils.page import fetch_page_if_changed, load_page
+from utils.pipeline import parse_page_content, run_dag
+from utils.probe_cache import ProbeCache
+from utils.text_utils import clean_text_preserve_paragraphs
+
+# 每年的处理流程（DAG）：阶段名 -> 依赖的阶段
+STAGES = {
+    'snapshot': (),
+    'parse': ('snapshot',),
+    'links': ('parse',),
+    'text': ('parse',),
+    'prompts': ('links', 'text'),
+}
+
+
+def year_paths(year):
+    return {
+        'snapshot': f"data/snaps/{year}.html",
+        'links': f"data/document_info/extracted_links_{year}.json",
+        'text': f"data/html_content/{year}.txt",
+        'prompt_txt': f"data/prompts/{year}.txt",
+        'prompt_json': f"data/prompts/{year}.json",
+        'prompt_batches': f"data/prompts/{year}.batches.json",
+    }
+
+
+class Pipeline:
+    """
+    Snapshot -> parse -> links / text -> prompts for several years at once.
+
+    Each stage records the hash of its inputs in a Manifest; a stage whose
+    inputs are unchanged and whose outputs still exist is skipped.
+    """
+
+    def __init__(self, process_pool, probe_pool=None, cache=None, parser=None, manifest=None, force=False):
+        self.process_pool = process_pool
+        self.client = get_client()
+        self.cache = cache
+        self.parser = parser
+        self.manifest = manifest or Manifest()
+        self.force = force
+        # 整个运行共用一个探测器：跨年份重复出现的链接只探测一次；
+        # 各年份的探测共用 probe_pool，同时进行的请求数不超过客户端连接池大小
+        self.prober = LinkProber(headers, client=self.client, cache=cache, executor=probe_pool)
+        self.timings = {}
+        self.status = {}
+
+    def run_stage(self, year, stage, deps):
+        start = time.perf_counter()
+        result = getattr(self, f"stage_{stage}")(year, deps)
+        self.timings[(year, stage)] = time.perf_counter() - start
+        self.status.setdefault((year, stage), 'ran')
+        return result
+
+    def is_fresh(self, year, stage, input_hash, outputs=None):
+        return not self.force and self.manifest.is_fresh(year, stage, input_hash, outputs)
+
+    def skip(self, year, stage):
+        self.status[(year, stage)] = 'skipped'
+
+    # I/O：下载页面（条件请求）并保存快照
+    def stage_snapshot(self, year, deps):
+        url = f"{solicitation_base_url}{year}-Solicitation"
+        path = year_paths(year)['snapshot']
+        entry = self.manifest.get(year, 'snapshot') if os.path.exists(path) and not self.force else None
+        # 旧清单没有记录页面编码：完整请求一次，避免 304 时按错误的编码解析快照
+        if entry and not entry.get('encoding'):
+            entry = None
+
+        page, validators = fetch_page_if_changed(
+            url, headers, self.client,
+            etag=entry and entry.get('etag'), last_modified=entry and entry.get('last_modified'),
+            parser=self.parser,
+        )
+        if page is None:
+            # 304：页面未变化，直接使用磁盘上的快照，按首次下载时的编码解码
+            page = load_page(url, path, encoding=entry['encoding'], parser=self.parser)
+
+        # 解析结果取决于字节和所用编码，两者一起作为下游阶段的输入哈希
+        page_hash = hash_bytes(page.content, page.encoding.encode())
+        if self.is_fresh(year, 'snapshot', page_hash):
+            self.skip(year, 'snapshot')
+        else:
+            page.save_snapshot(os.path.dirname(path), os.path.basename(path))
+        self.manifest.record(year, 'snapshot', page_hash, [path], encoding=page.encoding, **validators)
+        return {'page': page, 'page_hash': page_hash}
+
+    # CPU：在进程池中解析 HTML，提取候选链接和纯文本
+    def stage_parse(self, year, deps):
+        page, page_hash = deps['snapshot']['page'], deps['snapshot']['page_hash']
+        result = {'url': page.url, 'page_hash': page_hash}
+
+        # 下游的 links 和 text 都不需要重建时，无需解析
+        if self.is_fresh(year, 'links', page_hash) and self.is_fresh(year, 'text', page_hash):
+            self.skip(year, 'parse')
+            return result
+
+        future = self.process_pool.submit(parse_page_content, page.url, page.content, page.encoding, self.parser)
+        return dict(future.result(), **result)
+
+    # I/O：并发探测链接并保存
+    def stage_links(self, year, deps):
+        parsed = deps['parse']
+        path = year_paths(year)['links']
+        if self.is_fresh(year, 'links', parsed['page_hash']):
+            self.skip(year, 'links')
+            return path
+
+        candidates = parsed['candidates']
+        probed = self.prober.probe_many([(href, raw_text) for href, raw_text, _ in candidates], parsed['url'])
+        links = known_type_links(candidates, probed)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(links, f, ensure_ascii=False, indent=2)
+        self.manifest.record(year, 'links', parsed['page_hash'], [path])
+        return path
+
+    def stage_text(self, year, deps):
+        parsed = deps['parse']
+        path = year_paths(year)['text']
+        if self.is_fresh(year, 'text', parsed['page_hash']):
+            self.skip(year, 'text')
+            return path
+
+        cleaned_text = clean_text_preserve_paragraphs(parsed['text'])
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(cleaned_text)
+        self.manifest.record(year, 'text', parsed['page_hash'], [path])
+        return path
+
+    def stage_prompts(self, year, deps):
+        paths = year_paths(year)
+        # 输入：提取的链接列表 + 参考文本
+        input_hash = hash_files(deps['links'], deps['text'])
+        outputs = [paths['prompt_txt'], paths['prompt_json'], paths['prompt_batches']]
+        if self.is_fresh(year, 'prompts', input_hash, outputs):
+            self.skip(year, 'prompts')
+            return paths['prompt_json']
+
+        generate_string_prompts(deps['links'], deps['text'], output_path=paths['prompt_txt'])
+        generate_json_prompt(deps['links'], deps['text'], output_path=paths['prompt_json'])
+        generate_batched_prompts(deps['links'], deps['text'], year, output_path=paths['prompt_batches'])
+        self.manifest.record(year, 'prompts', input_hash, outputs)
+        return paths['prompt_json']
+
+
+def print_summary(pipeline, years, errors, skipped, elapsed):
+    print("\n==== Pipeline summary ====")
+    print(f"{'year':<6}" + "".join(f"{stage:>16}" for stage in STAGES))
+    for year in years:
+        cells = []
+        for stage in STAGES:
+            if (year, stage) in errors:
+                cells.append(f"{'failed':>16}")
+            elif (year, stage) in skipped:
+                cells.append(f"{'-':>16}")
+            else:
+                status = pipeline.status.get((year, stage), 'ran')
+                cells.append(f"{status} {pipeline.timings.get((year, stage), 0):.2f}s".rjust(16))
+        print(f"{year:<6}" + "".join(cells))
+
+    ran = sum(1 for status in pipeline.status.values() if status == 'ran')
+    print(f"\nStages run: {ran}, skipped (inputs unchanged): {len(pipeline.status) - ran}")
+    print(f"Total wall time: {elapsed:.2f}s")
+    print(f"Probes: {pipeline.prober.stats()}")
+    print(f"HTTP: {pipeline.client.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run snapshot, link/text extraction and prompt generation for all years")
+    parser.add_argument('--years', type=int, nargs='+', default=default_years)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for HTML parsing")
+    parser.add_argument('--parser', default=None, help="HTML parser backend, see utils.html_parser")
+    parser.add_argument('--no-cache', action='store_true', help="do not use the on-disk probe cache")
+    parser.add_argument('--force', action='store_true', help="rebuild every stage even if its inputs are unchanged")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ProbeCache()
+    start = time.perf_counter()
+
+    # 解析进程在阶段线程和探测线程运行时才按需启动，用 spawn 避免 fork 继承被其他线程持有的锁
+    with ProcessPoolExecutor(max_workers=args.jobs, mp_context=multiprocessing.get_context('spawn')) as process_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as probe_pool:
+        pipeline = Pipeline(process_pool, probe_pool, cache=cache, parser=args.parser, force=args.force)
+        # I/O 阶段按年份并发，每个年份最多同时有两个阶段（links 与 text）在运行
+        _, errors, skipped = run_dag(args.years, STAGES, pipeline.run_stage, max_workers=2 * len(args.years))
+        pipeline.manifest.save()
+
+    print_summary(pipeline, args.years, errors, skipped, time.perf_counter() - start)
+    if cache is not None:
+        print(f"Probe cache: {cache.stats()}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
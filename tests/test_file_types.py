@@ -0,0 +1,56 @@
+import struct
+
+from utils.file_types import OLE_CONTAINER, OLE_DIR_ENTRY_SIZE, OLE_HEADER_SIZE, ContainerInspector
+
+SECTOR_SIZE = 512
+
+
+def ole_header(first_directory_sector=1, fat_sector=0):
+    header = bytearray(OLE_HEADER_SIZE)
+    header[:8] = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+    struct.pack_into('<H', header, 30, 9)
+    struct.pack_into('<I', header, 48, first_directory_sector)
+    struct.pack_into('<109I', header, 76, *([fat_sector] + [0xFFFFFFFF] * 108))
+    return bytes(header)
+
+
+def directory_sector(*names):
+    sector = bytearray(SECTOR_SIZE)
+    for index, name in enumerate(names):
+        encoded = (name + '\0').encode('utf-16-le')
+        offset = index * OLE_DIR_ENTRY_SIZE
+        sector[offset:offset + len(encoded)] = encoded
+        struct.pack_into('<H', sector, offset + 64, len(encoded))
+    return bytes(sector)
+
+
+def inspector(sectors):
+    """Serve the given sectors (by number) as ranged reads of a file that starts with the OLE header."""
+    def read_range(start, end):
+        return sectors.get(start // SECTOR_SIZE - 1)
+    return ContainerInspector(read_range)
+
+
+def test_directory_sector_names_the_type():
+    found = inspector({1: directory_sector('Root Entry', 'WordDocument')})
+
+    assert found.refine(OLE_CONTAINER, ole_header()) == 'doc'
+
+
+def test_truncated_directory_sector_keeps_the_container_type():
+    found = inspector({1: directory_sector('Root Entry', 'Workbook')[:100]})
+
+    assert found.refine(OLE_CONTAINER, ole_header()) == OLE_CONTAINER
+
+
+def test_truncated_fat_sector_keeps_the_container_type():
+    # 第一个目录扇区没有可识别的流名，沿 FAT 继续时 FAT 扇区只返回了一部分
+    found = inspector({1: directory_sector('Root Entry'), 0: b'\xff' * 6})
+
+    assert found.refine(OLE_CONTAINER, ole_header()) == OLE_CONTAINER
+
+
+def test_truncated_header_keeps_the_container_type():
+    found = ContainerInspector(lambda start, end: ole_header()[:200])
+
+    assert found.refine(OLE_CONTAINER, ole_header()[:64]) == OLE_CONTAINER
@@ -0,0 +1,31 @@
+from bs4 import BeautifulSoup
+
+from utils.link_utils import collect_link_candidates
+
+
+def candidates(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return collect_link_candidates(soup.find_all('a', href=True), 'https://example.com/page', set())
+
+
+def test_blank_anchor_texts_get_the_default_filename():
+    found = candidates('<a href="a.pdf">   </a>'
+                       '<a href="b.pdf">&nbsp;</a>')
+
+    assert [safe_text for _, _, safe_text in found] == ['unnamed_file', 'unnamed_file']
+    assert [raw_text for _, raw_text, _ in found] == ['', '']
+
+
+def test_anchor_without_text_keeps_an_empty_filename():
+    # sanitize_filename('') 一直返回 ''，只有空白的文本才得到默认文件名
+    found = candidates('<a href="c.pdf"><img src="c.png"></a>')
+
+    assert found == [('c.pdf', '', '')]
+
+
+def test_anchor_texts_are_cleaned_and_sanitized():
+    found = candidates('<a href="a.pdf"> Annual  report: 2024 </a>'
+                       '<a href="a.pdf">duplicate</a>'
+                       '<a href="javascript:void(0)">skipped</a>')
+
+    assert found == [('a.pdf', 'Annual report: 2024', 'Annual_report_2024')]
@@ -0,0 +1,18 @@
+import requests
+
+from utils.llm_client import LLMClient
+
+
+def response_with(headers):
+    response = requests.Response()
+    response.status_code = 429
+    response.headers.update(headers)
+    return response
+
+
+def test_retry_after_is_capped_by_backoff_max():
+    llm = LLMClient(base_url='http://127.0.0.1:1', backoff_max=5, tokenizer='bytes')
+
+    assert llm.backoff(0, response_with({'Retry-After': '86400'})) == 5
+    assert llm.backoff(0, response_with({'Retry-After': '1.5'})) == 1.5
+    assert 0 <= llm.backoff(3, response_with({})) <= 5
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from utils.probe_cache import ProbeCache
+
+
+def test_redirects_are_bounded_least_recently_used_first():
+    cache = ProbeCache(":memory:", ttl=3600, max_entries=2)
+    cache.put_redirect("a", "target-a")
+    cache.put_redirect("b", "target-b")
+    assert cache.get_redirect("a") == "target-a"
+    cache.put_redirect("c", "target-c")
+
+    assert cache.get_redirect("b") is None
+    assert cache.get_redirect("a") == "target-a"
+    assert cache.get_redirect("c") == "target-c"
+    assert cache.stats()["redirect_entries"] == 2
+
+
+def test_expired_redirects_are_dropped_on_insert():
+    cache = ProbeCache(":memory:", ttl=3600, max_entries=10)
+    cache.put_redirect("old", "target-old")
+    cache._conn.execute("UPDATE redirects SET resolved_at = ?", (time.time() - 7200,))
+    cache.put_redirect("new", "target-new")
+
+    assert [row[0] for row in cache._conn.execute("SELECT url FROM redirects")] == ["new"]
+    assert cache.stats()["redirect_entries"] == 1
+
+
+def test_redirect_table_without_accessed_at_is_migrated(tmp_path):
+    path = str(tmp_path / "probes.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE redirects (url TEXT PRIMARY KEY, target TEXT NOT NULL, resolved_at REAL NOT NULL)")
+    conn.execute("INSERT INTO redirects VALUES ('a', 'target-a', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    cache = ProbeCache(path, ttl=3600, max_entries=1)
+    assert cache.get_redirect("a") == "target-a"
+    cache.put_redirect("b", "target-b")
+
+    assert cache.get_redirect("a") is None
+    assert cache.get_redirect("b") == "target-b"
@@ -0,0 +1,103 @@
+# utils/batch_utils.py
+import json
+import re
+
+from config.config import llm_model, batch_endpoint
+from utils.json_utils import iter_json_array, iter_jsonl
+from utils.prompt_utils import answer_context_key, item_cache_key, prompt_item, serialize_item
+
+# 模型回答可能包在 ```json ... ``` 代码块中
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def batch_request(batch, model=None, endpoint=None):
+    """One provider batch-API request line (OpenAI-style) for a prompt batch; ``custom_id`` is the batch id."""
+    return {
+        'custom_id': batch['batch_id'],
+        'method': 'POST',
+        'url': endpoint or batch_endpoint,
+        'body': {
+            'model': model or llm_model,
+            'messages': [{'role': 'user', 'content': batch['prompt']}],
+            'temperature': 0,
+        },
+    }
+
+
+def parse_answer(content):
+    """The JSON array returned by the model, tolerating a surrounding code fence."""
+    answer = json.loads(CODE_FENCE.sub('', content.strip()))
+    return answer if isinstance(answer, list) else [answer]
+
+
+def iter_batch_results(results_path):
+    """
+    Stream a batch-API results file and yield ``(custom_id, answer item)`` pairs.
+
+    Failed requests and unparsable answers are reported and skipped; results may
+    come back in any order.
+    """
+    for result in iter_jsonl(results_path):
+        custom_id = result.get('custom_id')
+        response = result.get('response') or {}
+        if result.get('error') or response.get('status_code', 200) != 200:
+            print(f"[Warning] Batch {custom_id} failed: {result.get('error') or response.get('status_code')}")
+            continue
+        try:
+            content = response['body']['choices'][0]['message']['content']
+            answer = parse_answer(content)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            print(f"[Warning] Batch {custom_id} returned no usable answer: {e}")
+            continue
+        for item in answer:
+            if isinstance(item, dict) and item.get('id'):
+                yield custom_id, item
+
+
+def iter_joined_links(results_path, links_paths, cache=None, references=None, model=None, pre_classifier=None):
+    """
+    Join batch results back onto the link records by item id.
+
+    The results file is read once into an ``id -> answer`` map (a few bytes per
+    document); the link files are streamed.
+
+    With a ResponseCache, new answers are stored in it and documents that were
+    left out of the batches because they were cached get their cached answer.
+    The cache keys need each year's reference text (``references``: year -> text)
+    and the model.
+
+    Documents the pre-classifier (utils.rule_classifier.RuleClassifier) answered
+    when the prompts were built get that answer again; it must use the same rules
+    and threshold.
+
+    :param links_paths: dict year -> extracted_links_<year>.json path
+    :return: iterator of link records with ``category`` and ``custom_id`` added
+             (``custom_id`` is ``'cache'`` for cached answers and ``'rules'`` for
+             pre-classified documents, ``category`` is None
+             for documents without an answer)
+    """
+    answers = {item['id']: (custom_id, item) for custom_id, item in iter_batch_results(results_path)}
+
+    for year, path in links_paths.items():
+        context_key = None
+        if cache is not None:
+            context_key = answer_context_key(references[year], model)
+
+        for link in iter_json_array(path):
+            item = prompt_item(link, year)
+            custom_id, answer = answers.get(item['id'], (None, None))
+            if cache is not None:
+                key = item_cache_key(context_key, serialize_item(item))
+                if answer is not None:
+                    cache.put(key, answer, item_id=item['id'])
+                else:
+                    answer = cache.get(key)
+                    custom_id = 'cache' if answer is not None else None
+            if answer is None and pre_classifier is not None:
+                answer = pre_classifier.answer(item)
+                custom_id = 'rules' if answer is not None else None
+
+            link['year'] = year
+            link['custom_id'] = custom_id
+            link['category'] = answer.get('category') if answer else None
+            yield link
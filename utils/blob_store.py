@@ -0,0 +1,264 @@
+# utils/blob_store.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from config.config import (
+    file_store_dir, download_chunk_bytes, download_per_host, max_workers as default_max_workers,
+)
+from utils.http_client import get_client
+
+
+# 部分下载的元数据：字段名 -> 响应头
+PARTIAL_META_HEADERS = {'etag': 'ETag', 'last_modified': 'Last-Modified', 'content_type': 'Content-Type'}
+
+CONTENT_RANGE = re.compile(r'bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)')
+
+
+def parse_content_range(value):
+    """(start, total length) from ``Content-Range: bytes a-b/N`` or ``bytes */N``; None for missing parts."""
+    match = CONTENT_RANGE.match(value or '')
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total.isdigit() else None)
+
+
+class HostLimiter:
+    """At most ``per_host`` concurrent downloads per host, whatever the size of the thread pool."""
+
+    def __init__(self, per_host=None):
+        self.per_host = per_host or download_per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+class BlobStore:
+    """
+    Content-addressed file store.
+
+    Files are streamed to ``partial/`` and moved to ``blobs/<aa>/<sha256>`` once
+    complete, so the same document linked from several years (or under several
+    URLs) is kept once. ``index.json`` maps every URL and link text to its blob.
+    """
+
+    def __init__(self, root=None, chunk_bytes=None):
+        self.root = root or file_store_dir
+        self.chunk_bytes = chunk_bytes or download_chunk_bytes
+        self.index_path = os.path.join(self.root, 'index.json')
+        self._lock = threading.Lock()
+        self.index = {'urls': {}, 'names': {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        self.stats = {'downloaded': 0, 'resumed': 0, 'skipped': 0, 'duplicates': 0, 'failed': 0, 'bytes': 0}
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, 'blobs', sha256[:2], sha256)
+
+    def partial_path(self, url):
+        return os.path.join(self.root, 'partial', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+
+    def lookup(self, url):
+        """Index entry of an already stored URL, None if missing or its blob is gone."""
+        with self._lock:
+            entry = self.index['urls'].get(url)
+        if entry and os.path.exists(self.blob_path(entry['sha256'])):
+            return entry
+        return None
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def read_partial(self, partial):
+        """
+        State of an interrupted download: (sha256 over its bytes, size, metadata).
+
+        The metadata holds the ETag / Last-Modified / Content-Type of the response
+        the partial file was started from, see ``write_partial_meta``.
+        """
+        digest, offset, meta = hashlib.sha256(), 0, {}
+        if os.path.exists(partial):
+            with open(partial, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_bytes), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+            if os.path.exists(f"{partial}.json"):
+                with open(f"{partial}.json", 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+        return digest, offset, meta
+
+    def write_partial_meta(self, partial, response):
+        meta = {name: response.headers.get(header) for name, header in PARTIAL_META_HEADERS.items()}
+        with open(f"{partial}.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        return meta
+
+    def fetch(self, url, headers=None, client=None):
+        """
+        Stream ``url`` into the store, resuming a partial download with ``Range``.
+
+        A resume sends ``If-Range`` with the ETag (or Last-Modified) of the response
+        the partial file came from, so a changed document is downloaded again from
+        the start instead of being spliced onto the old bytes.
+
+        :return: index entry of the stored blob
+        """
+        entry = self.lookup(url)
+        if entry:
+            self._count('skipped')
+            return entry
+
+        client = client or get_client()
+        partial = self.partial_path(url)
+        os.makedirs(os.path.dirname(partial), exist_ok=True)
+
+        # 断点续传：已有部分内容时只请求剩余字节，并把已有部分计入哈希
+        digest, offset, meta = self.read_partial(partial)
+        validator = meta.get('etag') or meta.get('last_modified')
+        if offset and not validator:
+            # 无法确认远端文件未变化，从头下载
+            digest, offset = hashlib.sha256(), 0
+
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+            request_headers['If-Range'] = validator
+
+        response = client.get(url, headers=request_headers, stream=True)
+        try:
+            if offset and response.status_code == 416:
+                _, total = parse_content_range(response.headers.get('Content-Range'))
+                if total != offset:
+                    # 远端文件变小或已变化：丢弃部分文件，从头下载
+                    response.close()
+                    digest, offset = hashlib.sha256(), 0
+                    response = client.get(url, headers=headers, stream=True)
+
+            if offset and response.status_code == 416:
+                # 416 且 Content-Range: bytes */N 与部分文件大小一致：部分文件已是完整内容
+                pass
+            else:
+                response.raise_for_status()
+                start, _ = parse_content_range(response.headers.get('Content-Range'))
+                if offset and (response.status_code != 206 or start != offset):
+                    # 服务器不支持范围请求，或文件已变化（If-Range 不匹配时返回 200），从头下载
+                    digest, offset = hashlib.sha256(), 0
+                elif offset:
+                    self._count('resumed')
+                if not offset:
+                    meta = self.write_partial_meta(partial, response)
+
+                expected = response.headers.get('Content-Length')
+                written = 0
+                with open(partial, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        written += len(chunk)
+                # Content-Length 按线上字节计（可能经过压缩），与原始传输量比较
+                transferred = response.raw.tell() if hasattr(response.raw, 'tell') else written
+                client.counter.add('bytes_downloaded', transferred)
+                self._count('bytes', transferred)
+
+                if expected is not None and transferred != int(expected):
+                    raise requests.RequestException(f"incomplete download: {transferred} of {expected} bytes")
+        finally:
+            response.close()
+
+        sha256 = digest.hexdigest()
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(partial)
+            self._count('duplicates')
+        else:
+            os.replace(partial, blob)
+            self._count('downloaded')
+        if os.path.exists(f"{partial}.json"):
+            os.remove(f"{partial}.json")
+
+        entry = {
+            'sha256': sha256,
+            'blob': os.path.relpath(blob, self.root),
+            'size': os.path.getsize(blob),
+            # 416 响应的 Content-Type 属于错误页，使用开始下载时记录的类型
+            'content_type': meta.get('content_type'),
+            'names': [],
+            'fetched_at': time.time(),
+        }
+        with self._lock:
+            self.index['urls'][url] = entry
+        return entry
+
+    def add_name(self, url, name):
+        """Record a link text (e.g. ``safe_text``) for a stored URL."""
+        with self._lock:
+            entry = self.index['urls'].get(url)
+            if entry is None or not name:
+                return
+            if name not in entry['names']:
+                entry['names'].append(name)
+            blobs = self.index['names'].setdefault(name, [])
+            if entry['sha256'] not in blobs:
+                blobs.append(entry['sha256'])
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            # 先写临时文件再替换，避免中断时损坏索引
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.index_path)
+
+
+def download_links(links, store=None, headers=None, client=None, max_workers=None, per_host=None):
+    """
+    Download the ``file_url`` of every link record (as written by extract_all_links) into a BlobStore.
+
+    Each distinct URL is fetched once; downloads run on a thread pool with at
+    most ``per_host`` of them against the same host at a time.
+
+    :return: dict file_url -> index entry, or the error message for failed downloads
+    """
+    store = store or BlobStore()
+    client = client or get_client()
+    limiter = HostLimiter(per_host)
+
+    names = {}
+    for link in links:
+        names.setdefault(link['file_url'], []).append(link.get('safe_text'))
+
+    def fetch(url):
+        with limiter(url):
+            try:
+                return store.fetch(url, headers, client)
+            except (requests.RequestException, OSError) as e:
+                print(f"[Error] Failed to download {url}: {e}")
+                store._count('failed')
+                return str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers or default_max_workers) as executor:
+        results = dict(zip(names, executor.map(fetch, names)))
+
+    for url, texts in names.items():
+        for text in texts:
+            store.add_name(url, text)
+    store.save()
+    return results
@@ -0,0 +1,228 @@
+# utils/export_utils.py
+import gzip
+import importlib.util
+import json
+import os
+from itertools import islice
+
+from config.config import export_dir, export_format, export_chunk_rows
+
+# 导出格式（按优先级）：格式名 -> 所需的模块
+EXPORT_FORMATS = {
+    'parquet': 'pyarrow',
+    'msgpack': 'msgpack',
+    'columns': None,
+}
+
+EXTENSIONS = {
+    'parquet': '.parquet',
+    'msgpack': '.msgpack',
+    'columns': '.columns.jsonl.gz',
+}
+
+# 导出的链接字段；section 为链接所在章节的路径（"A > B"）
+LINK_COLUMNS = ['text', 'url', 'file_type', 'file_url', 'filename', 'safe_text', 'section']
+
+
+def available_formats():
+    """Export formats that can be used in this environment, most compact first."""
+    return [
+        name for name, module in EXPORT_FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def resolve_format(fmt=None):
+    """
+    Pick the export format: the explicit argument, then ``config.export_format``,
+    then the first installed one. ``columns`` (standard library only) is always available.
+    """
+    fmt = fmt or export_format
+    available = available_formats()
+    if fmt:
+        if fmt not in available:
+            raise ValueError(f"Export format {fmt!r} is not available, choose from {available}")
+        return fmt
+    return available[0]
+
+
+def format_for_path(path):
+    for fmt, extension in EXTENSIONS.items():
+        if path.endswith(extension):
+            return fmt
+    raise ValueError(f"{path}: unknown export file extension, expected one of {list(EXTENSIONS.values())}")
+
+
+def export_path(name, fmt=None, output_dir=None):
+    fmt = resolve_format(fmt)
+    return os.path.join(output_dir or export_dir, f"{name}{EXTENSIONS[fmt]}")
+
+
+def iter_section_links(structure, path=()):
+    """
+    Link records of a structured-content tree (see utils.structure_utils), in
+    document order, each with its ``section`` path. Table links are also listed
+    in their section's ``links``, so they are not repeated from the tables.
+    """
+    for name, section in structure.items():
+        section_path = path + (name,)
+        for link in section.get('links', []):
+            yield dict(link, section=' > '.join(section_path))
+        yield from iter_section_links(section.get('subsections', {}), section_path)
+
+
+def iter_chunks(records, columns, chunk_rows):
+    records = iter(records)
+    while True:
+        rows = [[record.get(column) for column in columns] for record in islice(records, chunk_rows)]
+        if not rows:
+            return
+        yield rows
+
+
+def encode_column(values):
+    # 重复值多的列（file_type、section 等）按字典编码：去重后的值 + 每行的下标
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    if len(index) * 2 > len(values):
+        return values
+    return {'dict': list(index), 'codes': codes}
+
+
+def decode_column(column):
+    if isinstance(column, dict):
+        values = column['dict']
+        return [values[code] for code in column['codes']]
+    return column
+
+
+def write_columns(chunks, f, columns):
+    # 每块每列一行，列名写在行首，读取部分列时其余行不必解析
+    f.write(json.dumps({'format': 'link-columns', 'version': 1, 'columns': columns}) + '\n')
+    for rows in chunks:
+        for i, column in enumerate(columns):
+            values = encode_column([row[i] for row in rows])
+            f.write(json.dumps({'column': column, 'values': values}, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+
+
+def iter_column_chunks(f, columns):
+    """``{column: values}`` per chunk of a ``columns`` file, decoding only the requested columns."""
+    if not columns:
+        return
+    decoder = json.JSONDecoder()
+    chunk = {}
+    for line in f:
+        # 行首固定为 {"column":"<name>",
+        column, _ = decoder.raw_decode(line, len('{"column":'))
+        if column in columns:
+            chunk[column] = decode_column(json.loads(line)['values'])
+        if column == columns[-1] and len(chunk) == len(columns):
+            yield chunk
+            chunk = {}
+
+
+def write_links(records, output_path, fmt=None, columns=None, chunk_rows=None):
+    """
+    Write link records to a compact file, chunk by chunk, so ``records`` may be a generator.
+
+    ``parquet`` (pyarrow) and ``columns`` store each chunk column by column, with
+    repeated values dictionary-encoded; ``msgpack`` stores one array per record
+    after a header naming the columns. The file is written to a temporary path
+    and then moved into place.
+
+    :return: number of records written
+    """
+    fmt = resolve_format(fmt or format_for_path(output_path))
+    columns = list(columns or LINK_COLUMNS)
+    chunks = iter_chunks(records, columns, chunk_rows or export_chunk_rows)
+    count = 0
+
+    def counted(chunks):
+        nonlocal count
+        for rows in chunks:
+            count += len(rows)
+            yield rows
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for rows in counted(chunks):
+                arrays = [pa.array([row[i] for row in rows], pa.string()) for i in range(len(columns))]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    elif fmt == 'msgpack':
+        import msgpack
+        packer = msgpack.Packer()
+        with open(tmp_path, 'wb') as f:
+            f.write(packer.pack({'format': 'link-rows', 'version': 1, 'columns': columns}))
+            for rows in counted(chunks):
+                f.write(b''.join(packer.pack(row) for row in rows))
+    else:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            write_columns(counted(chunks), f, columns)
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def read_link_columns(input_path, columns=None):
+    """
+    Read an exported file into ``{column: [values]}``, only the requested columns.
+
+    This is the fast path for analytics: parquet reads only those columns from
+    disk, and no per-record dicts are built.
+    """
+    fmt = format_for_path(input_path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(input_path, columns=columns).to_pydict()
+
+    if fmt == 'msgpack':
+        import msgpack
+        with open(input_path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            names = next(unpacker)['columns']
+            wanted = [(names.index(column), column) for column in (names if columns is None else columns)]
+            result = {column: [] for _, column in wanted}
+            for row in unpacker:
+                for i, column in wanted:
+                    result[column].append(row[i])
+            return result
+
+    with gzip.open(input_path, 'rt', encoding='utf-8') as f:
+        names = json.loads(f.readline())['columns']
+        result = {column: [] for column in (names if columns is None else columns)}
+        for chunk in iter_column_chunks(f, [column for column in names if column in result]):
+            for column, values in chunk.items():
+                result[column].extend(values)
+        return result
+
+
+def iter_links(input_path, columns=None):
+    """Records of an exported file as dicts, in the order they were written."""
+    fmt = format_for_path(input_path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(columns=columns):
+            yield from batch.to_pylist()
+        return
+
+    if fmt == 'msgpack':
+        import msgpack
+        with open(input_path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            names = next(unpacker)['columns']
+            wanted = [(names.index(column), column) for column in (names if columns is None else columns)]
+            for row in unpacker:
+                yield {column: row[i] for i, column in wanted}
+        return
+
+    with gzip.open(input_path, 'rt', encoding='utf-8') as f:
+        names = json.loads(f.readline())['columns']
+        wanted = names if columns is None else columns
+        for chunk in iter_column_chunks(f, [column for column in names if column in wanted]):
+            for values in zip(*(chunk[column] for column in wanted)):
+                yield dict(zip(wanted, values))
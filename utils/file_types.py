@@ -0,0 +1,310 @@
+# utils/file_types.py
+import struct
+
+# 文件头签名 -> 文件类型；ZIP 与 OLE 是容器格式，需要再看内部目录才能区分具体类型
+MAGIC_NUMBERS = {
+    b'%PDF-': 'pdf',
+    b'\x50\x4B\x03\x04': 'zip/docx/xlsx',
+    b'\xD0\xCF\x11\xE0': 'doc/xls',
+    b'\x7B\x5C\x72\x74': 'rtf',
+    b'\x3C\x21\x44\x4F': 'html',
+    b'\x3C\x68\x74\x6D': 'html',
+    b'\x3C\x3F\x78\x6D': 'xml',
+    b'\x47\x49\x46\x38': 'gif',
+    b'\x89\x50\x4E\x47': 'png',
+    b'\xFF\xD8\xFF': 'jpg',
+}
+
+ZIP_CONTAINER = 'zip/docx/xlsx'
+OLE_CONTAINER = 'doc/xls'
+CONTAINER_TYPES = (ZIP_CONTAINER, OLE_CONTAINER)
+
+# OOXML 各类型的部件目录
+OOXML_PART_PREFIXES = (
+    ('word/', 'docx'),
+    ('xl/', 'xlsx'),
+    ('ppt/', 'pptx'),
+)
+
+# OLE 复合文档中标识具体类型的流名称
+OLE_STREAM_TYPES = {
+    'worddocument': 'doc',
+    'workbook': 'xls',
+    'book': 'xls',
+    'powerpoint document': 'ppt',
+}
+
+ZIP_LOCAL_HEADER = b'PK\x03\x04'
+ZIP_CENTRAL_HEADER = b'PK\x01\x02'
+ZIP_END_OF_DIRECTORY = b'PK\x05\x06'
+ZIP_EOCD_SIZE = 22
+ZIP_MAX_COMMENT = 0xFFFF
+# ZIP64：EOCD 中的数值饱和时，真实值在 ZIP64 EOCD 记录中，记录位置由紧挨 EOCD 之前的定位器给出
+ZIP64_END_OF_DIRECTORY = b'PK\x06\x06'
+ZIP64_LOCATOR = b'PK\x06\x07'
+ZIP64_EOCD_SIZE = 56
+ZIP64_LOCATOR_SIZE = 20
+
+OLE_HEADER_SIZE = 512
+OLE_DIR_ENTRY_SIZE = 128
+OLE_END_OF_CHAIN = 0xFFFFFFFE
+
+
+class MagicIndex:
+    """
+    Byte-prefix trie over file signatures.
+
+    Matching walks at most ``len(longest signature)`` bytes of the content,
+    independent of how many signatures are registered; the longest matching
+    signature wins.
+    """
+
+    _TERMINAL = -1  # 字节取值 0-255，-1 作为终止标记不会冲突
+
+    def __init__(self, signatures=None):
+        self._root = {}
+        self.max_length = 0
+        for magic, file_type in (signatures or {}).items():
+            self.add(magic, file_type)
+
+    def add(self, magic, file_type):
+        node = self._root
+        for byte in magic:
+            node = node.setdefault(byte, {})
+        node[self._TERMINAL] = file_type
+        self.max_length = max(self.max_length, len(magic))
+
+    def match(self, content, default='unknown'):
+        node = self._root
+        found = default
+        for byte in content[:self.max_length]:
+            node = node.get(byte)
+            if node is None:
+                break
+            found = node.get(self._TERMINAL, found)
+        return found
+
+
+MAGIC_INDEX = MagicIndex(MAGIC_NUMBERS)
+
+
+def match_magic(content: bytes) -> str:
+    return MAGIC_INDEX.match(content)
+
+
+def ooxml_type_from_names(names):
+    """docx / xlsx / pptx from ZIP member names, None if no OOXML part is among them."""
+    for name in names:
+        for prefix, file_type in OOXML_PART_PREFIXES:
+            if name.startswith(prefix):
+                return file_type
+    return None
+
+
+def zip_local_names(prefix):
+    """
+    Member names from the local file headers that fit entirely in ``prefix``.
+
+    Stops at the first entry whose compressed size is only known from a trailing
+    data descriptor (general purpose flag bit 3), since the next header cannot be located.
+    """
+    names = []
+    offset = 0
+    while prefix.startswith(ZIP_LOCAL_HEADER, offset) and offset + 30 <= len(prefix):
+        flags, = struct.unpack_from('<H', prefix, offset + 6)
+        compressed_size, = struct.unpack_from('<I', prefix, offset + 18)
+        name_length, extra_length = struct.unpack_from('<HH', prefix, offset + 26)
+        name_end = offset + 30 + name_length
+        if name_end > len(prefix):
+            break
+        names.append(prefix[offset + 30:name_end].decode('utf-8', errors='replace'))
+        if flags & 0x08:
+            break
+        offset = name_end + extra_length + compressed_size
+    return names
+
+
+def find_end_of_directory(tail):
+    """
+    Locate the end-of-central-directory record in the last bytes of a ZIP file.
+
+    When a ZIP64 locator precedes the EOCD, the directory size and offset come from
+    the ZIP64 record it points to; for a ZIP64 archive whose record is not in
+    ``tail`` the result is None.
+
+    :return: (position in tail of the record that follows the central directory,
+              central directory size, central directory offset) or None
+    """
+    position = tail.rfind(ZIP_END_OF_DIRECTORY)
+    while position != -1:
+        if position + ZIP_EOCD_SIZE <= len(tail):
+            entries, directory_size, directory_offset, comment_length = struct.unpack_from(
+                '<HIIH', tail, position + 10)
+            # 注释长度应与记录之后的剩余字节一致，避免误把数据中的签名当成 EOCD
+            if position + ZIP_EOCD_SIZE + comment_length == len(tail):
+                # 有 ZIP64 定位器时，中央目录结束于 ZIP64 EOCD 记录处（即使 EOCD 中的数值未饱和）
+                zip64 = find_zip64_end_of_directory(tail, position)
+                if zip64 is not None or entries == 0xFFFF or 0xFFFFFFFF in (directory_size, directory_offset):
+                    return zip64
+                return position, directory_size, directory_offset
+        position = tail.rfind(ZIP_END_OF_DIRECTORY, 0, position)
+    return None
+
+
+def find_zip64_end_of_directory(tail, eocd_position):
+    """:return: (position in tail, central directory size, central directory offset) of the ZIP64 record, or None"""
+    locator = eocd_position - ZIP64_LOCATOR_SIZE
+    if locator < 0 or not tail.startswith(ZIP64_LOCATOR, locator):
+        return None
+    # ZIP64 EOCD 记录可带扩展数据，以记录中的长度字段确认它正好结束在定位器处
+    record = tail.rfind(ZIP64_END_OF_DIRECTORY, 0, locator)
+    while record != -1:
+        if record + ZIP64_EOCD_SIZE <= locator:
+            record_size, = struct.unpack_from('<Q', tail, record + 4)
+            if record + 12 + record_size == locator:
+                directory_size, directory_offset = struct.unpack_from('<QQ', tail, record + 40)
+                return record, directory_size, directory_offset
+        record = tail.rfind(ZIP64_END_OF_DIRECTORY, 0, record)
+    return None
+
+
+def zip_central_names(directory):
+    """Member names listed in a ZIP central directory."""
+    names = []
+    offset = 0
+    while directory.startswith(ZIP_CENTRAL_HEADER, offset) and offset + 46 <= len(directory):
+        name_length, extra_length, comment_length = struct.unpack_from('<HHH', directory, offset + 28)
+        names.append(directory[offset + 46:offset + 46 + name_length].decode('utf-8', errors='replace'))
+        offset += 46 + name_length + extra_length + comment_length
+    return names
+
+
+def ole_stream_type(directory_sector):
+    """doc / xls / ppt from the entries of one OLE directory sector, None if not decisive."""
+    for offset in range(0, len(directory_sector) - OLE_DIR_ENTRY_SIZE + 1, OLE_DIR_ENTRY_SIZE):
+        entry = directory_sector[offset:offset + OLE_DIR_ENTRY_SIZE]
+        name_length, = struct.unpack_from('<H', entry, 64)
+        if not 2 <= name_length <= 64:
+            continue
+        name = entry[:name_length - 2].decode('utf-16-le', errors='replace').lower()
+        if name in OLE_STREAM_TYPES:
+            return OLE_STREAM_TYPES[name]
+    return None
+
+
+class ContainerInspector:
+    """
+    Tell docx / xlsx / pptx / zip and doc / xls / ppt apart with a few ranged reads.
+
+    ZIP: the member names in the sniffed prefix are tried first; otherwise the
+    end-of-central-directory record (ZIP64 included) is read from the file tail
+    and, if the central directory is not in that tail, the directory itself.
+    OLE: the 512-byte header gives the first directory sector, which is read and
+    followed through the FAT chain for a few sectors.
+
+    :param read_range: callable(start, end) -> bytes or None; ``start`` negative means
+                       "last -start bytes", ``end`` is inclusive. Must return None when
+                       the server ignores the range request.
+    """
+
+    def __init__(self, read_range, tail_bytes=16 * 1024, max_directory_bytes=256 * 1024, max_ole_sectors=8):
+        self.read_range = read_range
+        self.tail_bytes = tail_bytes
+        self.max_directory_bytes = max_directory_bytes
+        self.max_ole_sectors = max_ole_sectors
+
+    def refine(self, file_type, prefix):
+        """Return the specific type, or ``file_type`` unchanged if it cannot be determined."""
+        if file_type == ZIP_CONTAINER:
+            return self.zip_type(prefix) or file_type
+        if file_type == OLE_CONTAINER:
+            return self.ole_type(prefix) or file_type
+        return file_type
+
+    def zip_type(self, prefix):
+        # 前缀中的本地文件头往往已包含 word/、xl/ 等部件名，无需额外请求
+        found = ooxml_type_from_names(zip_local_names(prefix))
+        if found:
+            return found
+
+        names = self.zip_directory_names()
+        if names is None:
+            return None
+        return ooxml_type_from_names(names) or 'zip'
+
+    def zip_directory_names(self):
+        tail = self.read_range(-self.tail_bytes, None)
+        if tail is None:
+            return None
+        end = find_end_of_directory(tail)
+        if end is None and len(tail) >= self.tail_bytes:
+            # 归档注释很长时 EOCD 可能在更前面，读取最大可能范围
+            tail = self.read_range(-(ZIP_EOCD_SIZE + ZIP_MAX_COMMENT), None)
+            end = find_end_of_directory(tail) if tail is not None else None
+        if end is None:
+            return None
+
+        position, directory_size, directory_offset = end
+        if directory_size == 0:
+            return []
+        if directory_size > self.max_directory_bytes:
+            return None
+        if directory_size <= position:
+            # 中央目录通常紧挨在 EOCD（ZIP64 时为 ZIP64 EOCD 记录）之前，已包含在尾部数据中
+            directory = tail[position - directory_size:position]
+            if directory.startswith(ZIP_CENTRAL_HEADER):
+                return zip_central_names(directory)
+        # 否则按记录中的偏移读取；读到的不是中央目录（如文件前有附加数据）时放弃
+        directory = self.read_range(directory_offset, directory_offset + directory_size - 1)
+        if directory is None or not directory.startswith(ZIP_CENTRAL_HEADER):
+            return None
+        return zip_central_names(directory)
+
+    def ole_type(self, prefix):
+        header = prefix if len(prefix) >= OLE_HEADER_SIZE else self.read_range(0, OLE_HEADER_SIZE - 1)
+        if header is None or len(header) < OLE_HEADER_SIZE:
+            return None
+
+        sector_shift, = struct.unpack_from('<H', header, 30)
+        first_directory_sector, = struct.unpack_from('<I', header, 48)
+        if not 7 <= sector_shift <= 16:
+            return None
+        sector_size = 1 << sector_shift
+        # 头部 DIFAT 中的前 109 个 FAT 扇区位置，用于沿目录链继续查找
+        fat_sectors = struct.unpack_from('<109I', header, 76)
+
+        sector = first_directory_sector
+        for _ in range(self.max_ole_sectors):
+            if sector >= OLE_END_OF_CHAIN:
+                break
+            data = self.read_sector(sector, sector_size, prefix)
+            if data is None:
+                return None
+            found = ole_stream_type(data)
+            if found:
+                return found
+            sector = self.next_ole_sector(sector, sector_size, fat_sectors, prefix)
+            if sector is None:
+                return None
+        return None
+
+    def read_sector(self, sector, sector_size, prefix):
+        start = (sector + 1) * sector_size
+        if start + sector_size <= len(prefix):
+            return prefix[start:start + sector_size]
+        data = self.read_range(start, start + sector_size - 1)
+        # 文件比扇区偏移短或服务器只返回部分内容时，不足一个扇区的数据无法解析
+        if data is None or len(data) < sector_size:
+            return None
+        return data
+
+    def next_ole_sector(self, sector, sector_size, fat_sectors, prefix):
+        entries_per_sector = sector_size // 4
+        fat_index = sector // entries_per_sector
+        if fat_index >= len(fat_sectors):
+            return None
+        fat = self.read_sector(fat_sectors[fat_index], sector_size, prefix)
+        if fat is None:
+            return None
+        next_sector, = struct.unpack_from('<I', fat, (sector % entries_per_sector) * 4)
+        return next_sector
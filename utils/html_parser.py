@@ -0,0 +1,38 @@
+# utils/html_parser.py
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+from config.config import html_parser
+
+# 解析器后端（按优先级）：BeautifulSoup 的 tree builder 名称 -> 所需的模块
+PARSER_BACKENDS = {
+    'lxml': 'lxml',
+    'html.parser': None,
+}
+
+
+def available_backends():
+    """Parser backends that can be used in this environment, fastest first."""
+    return [
+        name for name, module in PARSER_BACKENDS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def resolve_backend(backend=None):
+    """
+    Pick the parser backend: the explicit argument, then ``config.html_parser``,
+    then the fastest installed one. ``html.parser`` is always available.
+    """
+    backend = backend or html_parser
+    available = available_backends()
+    if backend:
+        if backend not in available:
+            raise ValueError(f"HTML parser backend {backend!r} is not available, choose from {available}")
+        return backend
+    return available[0]
+
+
+def parse_html(markup, backend=None):
+    return BeautifulSoup(markup, resolve_backend(backend))
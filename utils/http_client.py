@@ -0,0 +1,158 @@
+# utils/http_client.py
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config.config import headers as default_headers, max_workers, request_timeout, http_record_path, http_replay
+
+
+class ConnectionCounter:
+    """Thread-safe counters for requests sent, TCP/TLS connections opened and body bytes read."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.bytes_downloaded = 0
+
+    def add(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(self.requests - self.connections_opened, 0),
+                "bytes_downloaded": self.bytes_downloaded,
+            }
+
+
+def _counting_pool_class(base, counter):
+    # 每建立一条新连接计一次 opened，每次发请求计一次 request，差值即复用次数
+    class CountingPool(base):
+        def _new_conn(self):
+            counter.add("connections_opened")
+            return super()._new_conn()
+
+        def urlopen(self, *args, **kwargs):
+            counter.add("requests")
+            return super().urlopen(*args, **kwargs)
+
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose per-host connection pools report to a ConnectionCounter."""
+
+    def __init__(self, counter, **kwargs):
+        self.counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.counter),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.counter),
+        }
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client.
+
+    Wraps a ``requests.Session`` with one connection pool per host, the default
+    headers from ``config.config.headers`` and a default timeout. ``stats()``
+    reports how many connections were opened vs. reused.
+
+    ``record_path`` records every exchange into a zip archive; ``replay`` sends
+    every request to a replay server instead, given as its base URL or as an
+    archive path (a server is then started in this process), see utils.http_replay.
+    """
+
+    def __init__(self, headers=None, pool_connections=10, pool_maxsize=None, timeout=None, record_path=None,
+                 replay=None):
+        self.timeout = timeout or request_timeout
+        self.counter = ConnectionCounter()
+        self.recorder = None
+        self.replay_adapter = None
+        self.replay_server = None
+
+        self.session = requests.Session()
+        self.session.headers.update(default_headers if headers is None else headers)
+
+        # pool_maxsize 至少与并发线程数相同，否则并发探测时连接会被丢弃而无法复用
+        options = {"pool_connections": pool_connections, "pool_maxsize": pool_maxsize or max_workers}
+        if record_path:
+            from utils.http_replay import ArchiveRecorder, RecordingAdapter
+            self.recorder = ArchiveRecorder(record_path)
+            adapter = RecordingAdapter(self.counter, self.recorder, **options)
+        elif replay:
+            from utils.http_replay import ReplayAdapter, serve
+            if replay.startswith(("http://", "https://")):
+                base_url = replay
+            else:
+                self.replay_server = serve(replay)
+                base_url = self.replay_server.base_url
+            adapter = self.replay_adapter = ReplayAdapter(self.counter, base_url, **options)
+        else:
+            adapter = PooledAdapter(self.counter, **options)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.request(method, url, **kwargs)
+        # 流式响应由调用方读取并自行计数（见 http_utils.read_prefix）
+        if not kwargs.get("stream"):
+            self.counter.add("bytes_downloaded", len(response.content))
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def stats(self):
+        stats = self.counter.snapshot()
+        if self.recorder is not None:
+            stats["record"] = self.recorder.stats()
+        if self.replay_adapter is not None:
+            stats["replay"] = self.replay_adapter.stats()
+            if self.replay_server is not None:
+                stats["replay"]["bytes"] = self.replay_server.counts["bytes"]
+        return stats
+
+    def close(self):
+        self.session.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay_server is not None:
+            self.replay_server.shutdown()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide shared HttpClient, creating it on first use.
+
+    It records or replays when ``HTTP_RECORD`` / ``HTTP_REPLAY`` are set (see config).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(record_path=http_record_path, replay=http_replay)
+    return _client
@@ -0,0 +1,338 @@
+# utils/http_replay.py
+import atexit
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from urllib3 import HTTPResponse
+
+from config.config import (
+    http_record_max_body_bytes, http_replay_latency, http_replay_jitter, http_replay_bandwidth,
+)
+from utils.http_client import PooledAdapter
+
+# 回放时参与匹配的请求头：同一 URL 的范围请求、条件请求各自对应录下的响应
+KEY_HEADERS = ('Range', 'If-None-Match', 'If-Modified-Since')
+# 录下的正文已解码，回放时重新分帧，这些编码 / 逐跳响应头不保存
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'connection', 'keep-alive'}
+# 回放服务的请求路径：/_replay/<URL 编码后的原始 URL>
+REPLAY_PREFIX = '/_replay/'
+
+
+def request_key(method, url, headers):
+    return json.dumps([method.upper(), url] + [headers.get(name) for name in KEY_HEADERS])
+
+
+class ArchiveRecorder:
+    """
+    Writes recorded HTTP exchanges to a zip archive.
+
+    ``index.jsonl`` has one entry per exchange: method, URL, the request headers
+    used for matching, status, reason, response headers and the body's SHA-256.
+    Bodies are stored deflated under ``bodies/<sha256>``, once per distinct body.
+    The archive is written to a temporary file and moved into place on ``close()``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(f"{path}.tmp", 'w', zipfile.ZIP_DEFLATED)
+        self._bodies = set()
+        self._index = []
+        atexit.register(self.close)
+
+    def record(self, method, url, request_headers, status, reason, headers, body, truncated=False):
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            'method': method,
+            'url': url,
+            'request_headers': {name: request_headers[name] for name in KEY_HEADERS if name in request_headers},
+            'status': status,
+            'reason': reason,
+            'headers': headers,
+            'body_sha256': digest,
+            'body_bytes': len(body),
+            'truncated': truncated,
+        }
+        with self._lock:
+            if self._zip is None:
+                return
+            if digest not in self._bodies:
+                self._bodies.add(digest)
+                self._zip.writestr(f"bodies/{digest}", body)
+            self._index.append(entry)
+
+    def stats(self):
+        with self._lock:
+            return {'recorded': len(self._index), 'bodies': len(self._bodies)}
+
+    def close(self):
+        with self._lock:
+            if self._zip is None:
+                return
+            self._zip.writestr('index.jsonl', ''.join(json.dumps(entry) + '\n' for entry in self._index))
+            self._zip.close()
+            self._zip = None
+            os.replace(f"{self.path}.tmp", self.path)
+
+
+class ReplayArchive:
+    """
+    Recorded exchanges loaded for replay, looked up by method, URL and the matching request headers.
+
+    When the same request was recorded several times, the recordings are served
+    in order and the last one is repeated.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._served = {}
+        self._lock = threading.Lock()
+        with zipfile.ZipFile(path) as zf:
+            bodies = {}
+            for line in zf.read('index.jsonl').decode('utf-8').splitlines():
+                entry = json.loads(line)
+                digest = entry['body_sha256']
+                if digest not in bodies:
+                    bodies[digest] = zf.read(f"bodies/{digest}")
+                entry['body'] = bodies[digest]
+                key = request_key(entry['method'], entry['url'], entry['request_headers'])
+                self.entries.setdefault(key, []).append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def lookup(self, method, url, headers):
+        key = request_key(method, url, headers)
+        with self._lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            position = self._served.get(key, 0)
+            self._served[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+
+class PrefixedStream(io.RawIOBase):
+    """The already-read start of a body, followed by the rest of the live (decoded) response."""
+
+    def __init__(self, prefix, response):
+        self.prefix = io.BytesIO(prefix)
+        self.response = response
+
+    def readable(self):
+        return True
+
+    def read(self, amt=-1):
+        data = self.prefix.read(amt)
+        if data or self.response is None:
+            return data
+        if amt is None or amt < 0:
+            return self.response.read(decode_content=True)
+        return self.response.read(amt, decode_content=True)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+        super().close()
+
+
+class RecordingAdapter(PooledAdapter):
+    """
+    Transport adapter that records every exchange into an ArchiveRecorder.
+
+    The body is read up to ``max_body_bytes`` (decoded) when the response arrives
+    and handed to the caller from memory, so streamed prefix reads behave as before;
+    a longer body is recorded truncated and the caller still reads all of it.
+    """
+
+    def __init__(self, counter, recorder, max_body_bytes=None, **kwargs):
+        self.recorder = recorder
+        self.max_body_bytes = max_body_bytes or http_record_max_body_bytes
+        super().__init__(counter, **kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        response = super().send(request, stream=True, **kwargs)
+
+        chunks, size, truncated = [], 0, False
+        if request.method != 'HEAD':
+            for chunk in response.raw.stream(64 * 1024, decode_content=True):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_body_bytes:
+                    truncated = True
+                    break
+        body = b''.join(chunks)
+        if not truncated:
+            response.close()
+
+        # 正文解码后原 Content-Length 不再对应，交由回放服务按实际长度发送
+        decoded = 'Content-Encoding' in response.headers
+        headers = [
+            [name, value] for name, value in response.raw.headers.items()
+            if name.lower() not in DROPPED_HEADERS and not (decoded and name.lower() == 'content-length')
+        ]
+        self.recorder.record(request.method, request.url, request.headers, response.status_code,
+                             response.reason, headers, body[:self.max_body_bytes], truncated)
+
+        stream_body = PrefixedStream(body, response.raw if truncated else None)
+        raw = HTTPResponse(body=stream_body, headers=headers, status=response.status_code,
+                           reason=response.reason, preload_content=False, decode_content=False,
+                           enforce_content_length=False)
+        recorded = self.build_response(request, raw)
+        if not stream:
+            recorded.content
+        return recorded
+
+
+class ReplayAdapter(PooledAdapter):
+    """
+    Transport adapter that sends every request to a replay server, keeping the original URL on the response.
+
+    Counts hits and misses (answers marked ``X-Replay-Miss``), also against a replay server in another process.
+    """
+
+    def __init__(self, counter, base_url, **kwargs):
+        self.base_url = base_url.rstrip('/')
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0}
+        super().__init__(counter, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def send(self, request, **kwargs):
+        original_url = request.url
+        request.url = f"{self.base_url}{REPLAY_PREFIX}{quote(original_url, safe='')}"
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            request.url = original_url
+        with self._lock:
+            self.counts['misses' if response.headers.get('X-Replay-Miss') else 'hits'] += 1
+        # 重定向的 Location 和相对链接都以原始 URL 为基准解析
+        response.url = original_url
+        return response
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.replay()
+
+    def do_HEAD(self):
+        self.replay()
+
+    def replay(self):
+        server = self.server
+        entry = None
+        if self.path.startswith(REPLAY_PREFIX):
+            entry = server.archive.lookup(self.command, unquote(self.path[len(REPLAY_PREFIX):]), self.headers)
+        if entry is None:
+            server.count('misses')
+            body = b'not recorded'
+            self.send_response(404)
+            self.send_header('X-Replay-Miss', '1')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+            return
+
+        server.count('hits')
+        if server.latency:
+            time.sleep(server.latency * random.uniform(1 - server.jitter, 1 + server.jitter))
+
+        body = entry['body'] if self.command != 'HEAD' else b''
+        self.send_response_only(entry['status'], entry['reason'])
+        has_length = False
+        for name, value in entry['headers']:
+            has_length = has_length or name.lower() == 'content-length'
+            self.send_header(name, value)
+        # 录制时截断的正文：有原 Content-Length 时按它发出已有部分后断开；
+        # 没有（原响应经过压缩或分块）时分块发送且不发结束块。两种情况下读取完整正文都会报错，只读前缀不受影响
+        chunked = entry['truncated'] and not has_length and self.command != 'HEAD'
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        elif not has_length and self.command != 'HEAD' and entry['status'] not in (204, 304):
+            self.send_header('Content-Length', str(len(body)))
+        if entry['truncated']:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+
+        try:
+            self.send_body(body, chunked)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def send_body(self, body, chunked=False):
+        bandwidth = self.server.bandwidth
+        # 按带宽限速时每 50ms 发送一块，否则一次发完
+        chunk_size = max(1, int(bandwidth / 20)) if bandwidth else max(1, len(body))
+        for start in range(0, len(body), chunk_size):
+            chunk = body[start:start + chunk_size]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+            self.server.count('bytes', len(chunk))
+            if bandwidth:
+                time.sleep(len(chunk) / bandwidth)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local HTTP stand-in that serves the responses of a recorded archive.
+
+    :param latency: seconds before each response
+    :param jitter: relative random spread of the latency (0.2 = ±20%)
+    :param bandwidth: bytes per second per response, 0 for unlimited
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, archive, latency=None, jitter=None, bandwidth=None):
+        super().__init__(address, ReplayHandler)
+        self.archive = archive if isinstance(archive, ReplayArchive) else ReplayArchive(archive)
+        self.latency = http_replay_latency if latency is None else latency
+        self.jitter = http_replay_jitter if jitter is None else jitter
+        self.bandwidth = http_replay_bandwidth if bandwidth is None else bandwidth
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def handle_error(self, request, client_address):
+        # 客户端读完前缀即断开等情况不打印堆栈
+        pass
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve(archive, host='127.0.0.1', port=0, **options):
+    """Start a ReplayServer in a background thread; ``port=0`` picks a free port (see ``server.base_url``)."""
+    server = ReplayServer((host, port), archive, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,107 +1,514 @@
 # utils/http_utils.py
 import os
+import threading
+from email.message import Message
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import requests
 import re
-from urllib.parse import urljoin
-
-from bs4 import BeautifulSoup
-
-MAGIC_NUMBERS = {
-    b'%PDF-': 'pdf',
-    b'\x50\x4B\x03\x04': 'zip/docx/xlsx',
-    b'\xD0\xCF\x11\xE0': 'doc/xls',
-    b'\x7B\x5C\x72\x74': 'rtf',
-    b'\x3C\x21\x44\x4F': 'html',
-    b'\x3C\x68\x74\x6D': 'html',
-    b'\x3C\x3F\x78\x6D': 'xml',
-    b'\x47\x49\x46\x38': 'gif',
-    b'\x89\x50\x4E\x47': 'png',
-    b'\xFF\xD8\xFF': 'jpg',
-}
-
-def match_magic(content: bytes) -> str:
-    for magic, filetype in MAGIC_NUMBERS.items():
-        if content.startswith(magic):
-            return filetype
-    return 'unknown'
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from bs4 import Tag
+
+from config.config import (
+    max_workers as default_max_workers, sniff_bytes, interstitial_max_bytes,
+    container_tail_bytes, container_directory_max_bytes,
+)
+from utils.file_types import CONTAINER_TYPES, ContainerInspector, match_magic
+from utils.http_client import get_client
+from utils.page import Page
+
+
+def read_prefix(response, max_bytes):
+    """
+    Read at most ``max_bytes`` of a streamed response body and release the connection.
+
+    :return: (body prefix, bytes actually transferred on the wire)
+    """
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=min(max_bytes, 8192)):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+        transferred = response.raw.tell() if hasattr(response.raw, 'tell') else size
+    finally:
+        # 读完前缀立即关闭：206 响应已读完可归还连接池，200 响应则直接断开，不再下载剩余正文
+        response.close()
+    return b''.join(chunks)[:max_bytes], transferred
+
+
+def fetch_range(url, start, end=None, headers=None, client=None):
+    """
+    Ranged GET of ``bytes=start-end`` (inclusive); a negative ``start`` asks for the last ``-start`` bytes.
+
+    Servers that ignore the range get a streamed read that is closed after the
+    requested length. For a range that does not start at 0 such a full response is
+    useless, so it is closed unread and ``content`` is None.
+    """
+    client = client or get_client()
+    if start < 0:
+        spec, max_bytes = f'bytes={start}', -start
+    else:
+        spec, max_bytes = f'bytes={start}-{end}', end - start + 1
+
+    request_headers = dict(headers or {})
+    request_headers['Range'] = spec
+
+    response = client.get(url, headers=request_headers, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.RequestException:
+        response.close()
+        raise
+
+    if start != 0 and response.status_code != 206:
+        response.close()
+        content, transferred = None, 0
+    else:
+        content, transferred = read_prefix(response, max_bytes)
+    client.counter.add('bytes_downloaded', transferred)
+
+    return {
+        'content': content,
+        'status': response.status_code,
+        'headers': response.headers,
+        'bytes': transferred,
+    }
+
+
+def sniff_url(url, headers=None, client=None, max_bytes=None):
+    """
+    Fetch only the first ``max_bytes`` of a URL for magic-number sniffing.
+
+    Sends ``Range: bytes=0-N``; servers that ignore the range get a streamed
+    read that is closed after the prefix, so a probe never pulls a full document.
+    """
+    return fetch_range(url, 0, (max_bytes or sniff_bytes) - 1, headers, client)
+
+
+def inspect_container(url, file_type, prefix, headers=None, client=None):
+    """
+    Resolve the ZIP / OLE container types to docx, xlsx, pptx, zip, doc, xls or ppt.
+
+    Uses ranged reads of the ZIP central directory or the OLE directory sectors
+    instead of downloading the document.
+
+    :return: (file type, bytes transferred by the extra reads)
+    """
+    if file_type not in CONTAINER_TYPES:
+        return file_type, 0
+
+    transferred = 0
+
+    def read_range(start, end):
+        nonlocal transferred
+        try:
+            ranged = fetch_range(url, start, end, headers, client)
+        except requests.RequestException as e:
+            print(f"[Warning] Range read failed for {url}: {e}")
+            return None
+        transferred += ranged['bytes']
+        return ranged['content']
+
+    inspector = ContainerInspector(read_range, tail_bytes=container_tail_bytes,
+                                   max_directory_bytes=container_directory_max_bytes)
+    return inspector.refine(file_type, prefix), transferred
+
+
+REDIRECT_MARKER = b"window.parent.location.href"
+REDIRECT_PATTERN = re.compile(rb"window\.parent\.location\.href='(.*?)';")
+
+
+class RedirectScanner:
+    """
+    Incremental search for ``window.parent.location.href='...';`` in a body read chunk by chunk.
+
+    Only the unmatched tail that could still start a match is kept between
+    chunks (from the last marker, or the last ``len(marker) - 1`` bytes), so a
+    redirect split across a chunk boundary is still found.
+    """
+
+    def __init__(self):
+        self._buffer = b''
+        self.target = None
+
+    def feed(self, chunk):
+        """Add a chunk; returns the redirect target once found, else None."""
+        if self.target is not None:
+            return self.target
+        self._buffer += chunk
+        match = REDIRECT_PATTERN.search(self._buffer)
+        if match:
+            self.target = match.group(1).decode('utf-8', errors='ignore')
+            self._buffer = b''
+            return self.target
+
+        marker = self._buffer.rfind(REDIRECT_MARKER)
+        if marker >= 0:
+            self._buffer = self._buffer[marker:]
+        else:
+            self._buffer = self._buffer[-(len(REDIRECT_MARKER) - 1):]
+        return None
+
+
+def scan_redirect(url, headers=None, client=None, max_bytes=None, prefix=None):
+    """
+    Stream the portal download interstitial until the redirect script is found or ``max_bytes`` were read.
+
+    :param prefix: body bytes already read from ``url`` (e.g. by sniff_url); they are
+                   scanned first and, if they hold no match, the read resumes after them
+                   with a ``Range`` request
+    :return: (status code, redirect target or None, bytes transferred)
+    """
+    client = client or get_client()
+    max_bytes = max_bytes or interstitial_max_bytes
+    scanner = RedirectScanner()
+
+    offset = 0
+    if prefix:
+        if scanner.feed(prefix):
+            return 200, scanner.target, 0
+        offset = len(prefix)
+
+    request_headers = dict(headers or {})
+    if offset:
+        request_headers['Range'] = f'bytes={offset}-{max_bytes - 1}'
+
+    response = client.get(url, headers=request_headers, stream=True)
+    if offset and response.status_code == 416:
+        # 前缀已是完整正文
+        response.close()
+        return 200, None, 0
+    if offset and response.status_code != 206:
+        # 服务器忽略了范围请求，从头扫描
+        scanner, offset = RedirectScanner(), 0
+
+    size = offset
+    try:
+        for chunk in response.iter_content(chunk_size=8192):
+            size += len(chunk)
+            if scanner.feed(chunk) or size >= max_bytes:
+                break
+        transferred = response.raw.tell() if hasattr(response.raw, 'tell') else size - offset
+    finally:
+        # 找到跳转地址后立即关闭，不再读取剩余正文
+        response.close()
+    client.counter.add('bytes_downloaded', transferred)
+
+    return response.status_code, scanner.target, transferred
 
-import requests
-import re
-from urllib.parse import urljoin
 
-def detect_file_type(url, headers=None, base_url=None):
+def response_validators(sniffed):
+    """ETag / Last-Modified of a sniffed response, used for conditional revalidation."""
+    return {
+        'etag': sniffed['headers'].get('ETag'),
+        'last_modified': sniffed['headers'].get('Last-Modified'),
+    }
+
+
+def response_metadata(sniffed):
+    """
+    Real filename, MIME type and total size of a probed document, read from the probe response headers.
+
+    For a ranged (206) response the size comes from ``Content-Range``, since
+    ``Content-Length`` only covers the returned prefix.
+    """
+    response_headers = sniffed['headers']
+
+    filename = None
+    disposition = response_headers.get('Content-Disposition')
+    if disposition:
+        # email.message 处理 filename 与 RFC 2231 / 5987 编码的 filename*
+        message = Message()
+        message['Content-Disposition'] = disposition
+        filename = message.get_filename()
+
+    content_type = response_headers.get('Content-Type')
+    mime_type = content_type.split(';', 1)[0].strip().lower() if content_type else None
+
+    size = None
+    content_range = response_headers.get('Content-Range')
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        size = int(total) if total.isdigit() else None
+    elif sniffed['status'] == 200 and response_headers.get('Content-Length', '').isdigit():
+        size = int(response_headers['Content-Length'])
+
+    return {'filename': filename, 'mime_type': mime_type, 'size': size}
+
+
+def probe_result(file_type, url, probe_bytes, sniffed):
+    """Probe result for a sniffed document: type, final URL, validators and header metadata."""
+    return {'type': file_type, 'url': url, 'bytes': probe_bytes,
+            **response_validators(sniffed), **response_metadata(sniffed)}
+
+
+def canonicalize_url(url):
+    """Normalize a URL for use as a cache key: lower-case scheme/host, no default port, no fragment."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def sniff_file_type(url, headers=None, client=None):
+    """Sniff ``url`` and resolve container types; returns (file type, sniff response, bytes transferred)."""
+    sniffed = sniff_url(url, headers, client=client)
+    file_type, extra_bytes = inspect_container(url, match_magic(sniffed['content']), sniffed['content'],
+                                               headers, client)
+    return file_type, sniffed, sniffed['bytes'] + extra_bytes
+
+
+def detect_file_type(url, headers=None, base_url=None, client=None, redirects=None):
+    """
+    :param redirects: optional store of resolved interstitial -> target URLs
+                      (``get_redirect`` / ``put_redirect``, e.g. a ProbeCache)
+    """
+    client = client or get_client()
+    probe_bytes = 0
+    sniffed = None
     try:
         # 如果提供了base_url，则合并url
         if base_url:
             url = urljoin(base_url, url)
+        interstitial_url = urljoin("https://portal.nyserda.ny.gov", url)
+        redirect_key = canonicalize_url(interstitial_url)
+
+        # 已解析过的中间页：跳过中间页，直接探测目标
+        cached_target = redirects.get_redirect(redirect_key) if redirects is not None else None
+        if cached_target:
+            try:
+                file_type, redirected, transferred = sniff_file_type(cached_target, headers, client)
+                probe_bytes += transferred
+                if file_type != 'unknown':
+                    return probe_result(file_type, cached_target, probe_bytes, redirected)
+            except requests.RequestException as e:
+                print(f"[Warning] Cached redirect target failed for {url}: {e}")
 
         try:
-            # 第一次GET请求
-            response = requests.get(url, headers=headers, timeout=20, stream=True)
-            response.raise_for_status()
-
-            content = response.raw.read(512)
-
-            file_type = match_magic(content)
+            # 第一次请求：只取前 sniff_bytes 字节
+            file_type, sniffed, transferred = sniff_file_type(url, headers, client)
+            probe_bytes += transferred
 
             if file_type != 'unknown':
-                return {'type': file_type, 'url': url}
+                return probe_result(file_type, url, probe_bytes, sniffed)
 
         except requests.RequestException as e:
             # 如果第一次请求失败，打印日志并继续执行后续操作
             print(f"[Warning] First request failed for {url}: {e}")
 
-        # 第二次GET请求（如果第一次失败）
-        url = urljoin("https://portal.nyserda.ny.gov", url)  # 拼接完整URL
-        doc_response = requests.get(url, headers=headers, allow_redirects=True)
-        print(doc_response.status_code)
-        print('1')
-        print(url)
+        # 第二次GET请求：流式扫描中间页，从第一次请求读到的位置继续
+        prefix = sniffed['content'] if sniffed is not None and url == interstitial_url else None
+        url = interstitial_url
+        status_code, target, transferred = scan_redirect(url, headers, client=client, prefix=prefix)
+        probe_bytes += transferred
 
-        if doc_response.status_code == 200:
-            print('2')
-            match = re.search(r"window\.parent\.location\.href='(.*?)';", doc_response.text)
-            if match:
-                redirected_url = urljoin(url, match.group(1))
-                print(redirected_url)
+        if status_code in (200, 206):
+            if target:
+                redirected_url = urljoin(url, target)
 
                 try:
                     # 对重定向的URL再次发起请求
-                    redirected_resp = requests.get(redirected_url, headers=headers, timeout=20, stream=True)
-                    redirected_resp.raise_for_status()
-                    redirected_content = redirected_resp.raw.read(512)
-                    file_type = match_magic(redirected_content)
-                    return {'type': file_type, 'url': redirected_url}
+                    file_type, redirected, transferred = sniff_file_type(redirected_url, headers, client)
+                    probe_bytes += transferred
+                    if redirects is not None:
+                        redirects.put_redirect(redirect_key, redirected_url)
+                    return probe_result(file_type, redirected_url, probe_bytes, redirected)
 
                 except requests.RequestException as e:
                     # 捕获重定向请求失败的异常
                     print(f"[Error] Failed to fetch redirected URL {redirected_url}: {e}")
-                    return {'type': 'unknown', 'url': redirected_url, 'error': str(e)}
-            return {'type': 'unknown', 'url': url}
-        return {'type': 'unknown', 'url': url}
+                    return {'type': 'unknown', 'url': redirected_url, 'error': str(e), 'bytes': probe_bytes}
+            return {'type': 'unknown', 'url': url, 'bytes': probe_bytes}
+        return {'type': 'unknown', 'url': url, 'bytes': probe_bytes}
 
     except Exception as e:
         print(f"[Error] Failed to detect file type from {url}: {e}")
-        return {'type': 'unknown', 'url': url, 'error': str(e)}
+        return {'type': 'unknown', 'url': url, 'error': str(e), 'bytes': probe_bytes}
 
 
-# 处理链接，检测链接类型
-def process_link(link_url, link_text, headers=None, base_url=None):
-    full_url = urljoin(base_url, link_url) if base_url else link_url
-    file_info = detect_file_type(full_url, headers, base_url)
+# 用缓存中的 ETag / Last-Modified 发送条件请求，304 表示文档未变化
+def revalidate_probe(entry, headers=None, client=None):
+    client = client or get_client()
+    conditional = dict(headers or {})
+    if entry['etag']:
+        conditional['If-None-Match'] = entry['etag']
+    if entry['last_modified']:
+        conditional['If-Modified-Since'] = entry['last_modified']
+    conditional['Range'] = f'bytes=0-{sniff_bytes - 1}'
 
+    try:
+        response = client.get(entry['file_url'], headers=conditional, stream=True)
+    except requests.RequestException as e:
+        print(f"[Warning] Revalidation failed for {entry['file_url']}: {e}")
+        return False
+
+    _, transferred = read_prefix(response, sniff_bytes)
+    client.counter.add('bytes_downloaded', transferred)
+    return response.status_code == 304
+
+
+def link_record(link_text, full_url, file_info):
     return {
         "text": link_text,
         "url": full_url,
         "is_pdf": bool(file_info['type'] == 'pdf'),
         "file_type": file_info['type'],  # 直接返回文件类型
         "file_url": file_info['url'],  # 返回文件的最终 URL
+        "content_filename": file_info.get('filename'),  # Content-Disposition 中的真实文件名
+        "mime_type": file_info.get('mime_type'),
+        "size": file_info.get('size'),
         "error": file_info.get('error', None)  # 若有错误，返回错误信息
     }
 
 
-def download_snapshot(url, output_dir='./snaps', filename='snapshot.html'):
+# 探测单个 URL 的文件类型，先查磁盘缓存
+def probe_file_info(full_url, headers=None, base_url=None, client=None, cache=None):
+    if cache is not None:
+        key = canonicalize_url(full_url)
+        entry = cache.get(key)
+        # 新鲜条目直接返回；过期条目先做条件请求验证；
+        # 旧版本写入的容器类型条目未经细分，重新探测一次（新条目带有 probe_version，之后照常命中）
+        legacy_container = entry and entry['file_type'] in CONTAINER_TYPES and not entry['probe_version']
+        if entry and not legacy_container and (entry['fresh'] or revalidate_probe(entry, headers, client)):
+            if not entry['fresh']:
+                cache.touch(key)
+            return {'type': entry['file_type'], 'url': entry['file_url'], 'filename': entry['filename'],
+                    'mime_type': entry['mime_type'], 'size': entry['size']}
+
+    file_info = detect_file_type(full_url, headers, base_url, client=client, redirects=cache)
+
+    # 出错的结果不写入缓存，下次运行重新探测
+    if cache is not None and not file_info.get('error'):
+        cache.put(
+            key,
+            file_type=file_info['type'],
+            file_url=file_info['url'],
+            redirect_url=file_info['url'] if file_info['url'] != full_url else None,
+            etag=file_info.get('etag'),
+            last_modified=file_info.get('last_modified'),
+            filename=file_info.get('filename'),
+            mime_type=file_info.get('mime_type'),
+            size=file_info.get('size'),
+        )
+
+    return file_info
+
+
+# 处理链接，检测链接类型
+def process_link(link_url, link_text, headers=None, base_url=None, client=None, cache=None):
+    full_url = urljoin(base_url, link_url) if base_url else link_url
+    file_info = probe_file_info(full_url, headers, base_url, client=client, cache=cache)
+    return link_record(link_text, full_url, file_info)
+
+
+class LinkProber:
+    """
+    Run-scoped link prober: each canonical URL hits the network at most once.
+
+    Results are memoized per canonical URL. A URL that is already being probed
+    by another thread is not probed again; the caller waits on the same Future.
+    Share one instance across all extractors of a run.
+
+    ``executor`` is a thread pool shared by every ``probe_many`` call, so pages
+    probed at the same time (e.g. several years) stay within its size in total;
+    without it each call uses its own pool of ``max_workers`` threads.
+    """
+
+    def __init__(self, headers=None, client=None, cache=None, max_workers=None, executor=None):
+        self.headers = headers
+        self.client = client or get_client()
+        self.cache = cache
+        self.max_workers = max_workers or default_max_workers
+        self.executor = executor
+
+        self._lock = threading.Lock()
+        self._memo = {}  # canonical URL -> Future[file_info]
+
+        self.total = 0  # 所有探测请求（含重复）
+        self.memo_hits = 0  # 已完成结果的复用
+        self.shared = 0  # 等待进行中的同一探测
+
+    def probe(self, link_url, link_text, base_url=None):
+        full_url = urljoin(base_url, link_url) if base_url else link_url
+        key = canonicalize_url(full_url)
+
+        with self._lock:
+            self.total += 1
+            future = self._memo.get(key)
+            owner = future is None
+            if owner:
+                future = self._memo[key] = Future()
+            elif future.done():
+                self.memo_hits += 1
+            else:
+                self.shared += 1
+
+        if owner:
+            try:
+                future.set_result(probe_file_info(full_url, self.headers, base_url,
+                                                  client=self.client, cache=self.cache))
+            except Exception as e:
+                future.set_result({'type': 'unknown', 'url': full_url, 'error': str(e)})
+            except BaseException as e:
+                # KeyboardInterrupt 等：让等待同一 URL 的线程也收到异常，而不是永远阻塞
+                future.set_exception(e)
+                raise
+
+        return link_record(link_text, full_url, future.result())
+
+    def probe_many(self, links, base_url=None):
+        """Probe (link_url, link_text) pairs concurrently; results keep the input order."""
+        if not links:
+            return []
+
+        if self.executor is not None:
+            return list(self.executor.map(lambda link: self.probe(link[0], link[1], base_url), links))
+
+        workers = min(self.max_workers, len(links))
+
+        # executor.map 按提交顺序返回结果，总耗时取决于最慢的链接
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda link: self.probe(link[0], link[1], base_url), links))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "total": self.total,
+                "unique": len(self._memo),
+                "memo_hits": self.memo_hits,
+                "shared_in_flight": self.shared,
+            }
+
+
+# 并发处理多个链接，结果顺序与输入顺序一致
+def probe_links(links, headers=None, base_url=None, max_workers=None, client=None, cache=None, prober=None):
+    """
+    Probe a list of links concurrently with a bounded thread pool.
+
+    :param links: list of (link_url, link_text) tuples, in page order
+    :param headers: request headers passed to every probe
+    :param base_url: page URL used to resolve relative links
+    :param max_workers: concurrency limit, defaults to config.max_workers
+    :param client: HttpClient shared by all probes, defaults to get_client()
+    :param cache: optional ProbeCache answering repeat probes across runs
+    :param prober: run-scoped LinkProber; a new one is used when omitted
+    :return: list of process_link results, same order as ``links``
+    """
+    prober = prober or LinkProber(headers, client=client, cache=cache, max_workers=max_workers)
+    return prober.probe_many(links, base_url)
+
+
+def download_snapshot(url, output_dir='./snaps', filename='snapshot.html', client=None, page=None):
+    # 已获取的页面直接保存同一份字节，不再重复请求
+    if page is not None:
+        return page.save_snapshot(output_dir, filename)
+
     # 设置请求头，防止被屏蔽
     headers = {
         "User-Agent": (
@@ -111,8 +518,9 @@ def download_snapshot(url, output_dir='./snaps', filename='snapshot.html'):
         )
     }
 
-    # 发起请求
-    response = requests.get(url, headers=headers)
+    # 发起请求（复用共享连接池）
+    client = client or get_client()
+    response = client.get(url, headers=headers)
 
     # 检查响应
     if response.status_code == 200:
@@ -131,40 +539,63 @@ def download_snapshot(url, output_dir='./snaps', filename='snapshot.html'):
         print(f"Failed to download page: status code {response.status_code}")
 
 
+HEADER_FOOTER_SELECTORS = [
+    'header', 'footer', 'nav',
+    '.footer', '.header', '.site-footer', '.site-header',
+    '#footer', '#header'
+]
+
+
 def remove_header_footer_tags(soup, keep_header_footer=True):
     """从 HTML 中移除 header 和 footer 区块（如果不保留）"""
     if not keep_header_footer:
-        for selector in [
-            'header', 'footer', 'nav',
-            '.footer', '.header', '.site-footer', '.site-header',
-            '#footer', '#header'
-        ]:
+        for selector in HEADER_FOOTER_SELECTORS:
             for tag in soup.select(selector):
                 tag.decompose()
 
 
-def extract_text_from_url(url, headers, keep_header_footer=False):
-    # 发送请求获取网页内容
-    response = requests.get(url, headers=headers)
-
-    if response.status_code != 200:
-        raise Exception(f"请求失败，状态码：{response.status_code}")
+def _iter_visible_strings(node, excluded, string_types):
+    for child in node.contents:
+        if isinstance(child, Tag):
+            if id(child) not in excluded:
+                yield from _iter_visible_strings(child, excluded, string_types)
+        elif type(child) in string_types:
+            yield child
 
-    # 解析 HTML
-    soup = BeautifulSoup(response.text, 'html.parser')
 
-    # 可选：移除 header/footer
-    remove_header_footer_tags(soup, keep_header_footer=keep_header_footer)
-
-    # 移除 script 和 style
-    for tag in soup(['script', 'style', 'noscript']):
-        tag.decompose()
+def extract_page_text(soup, keep_header_footer=False):
+    """
+    Plain text of a parsed page, same output as decomposing header/footer,
+    script, style and noscript and calling ``get_text(separator='\\n')``,
+    but without mutating the shared soup.
+    """
+    # 收集需要跳过的子树，遍历时整棵跳过
+    excluded = set()
+    if not keep_header_footer:
+        for selector in HEADER_FOOTER_SELECTORS:
+            excluded.update(id(tag) for tag in soup.select(selector))
+    excluded.update(id(tag) for tag in soup(['script', 'style', 'noscript']))
 
     # 提取纯文本
-    text = soup.get_text(separator='\n')
+    text = '\n'.join(_iter_visible_strings(soup, excluded, soup.interesting_string_types))
 
     # 清理多余空行和空白
     lines = [line.strip() for line in text.splitlines()]
     non_empty_lines = [line for line in lines if line]
 
     return '\n'.join(non_empty_lines)
+
+
+def extract_text_from_url(url, headers, keep_header_footer=False, client=None, page=None):
+    if page is None:
+        # 发送请求获取网页内容
+        client = client or get_client()
+        response = client.get(url, headers=headers)
+
+        if response.status_code != 200:
+            raise Exception(f"请求失败，状态码：{response.status_code}")
+
+        page = Page(url, response.content, response.encoding or response.apparent_encoding)
+
+    # 解析 HTML（同一页面只解析一次）
+    return extract_page_text(page.soup, keep_header_footer=keep_header_footer)
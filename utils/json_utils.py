@@ -1,7 +1,9 @@
 import json
+import os
+import re
 
 
-def extract_fields_from_json(input_path, output_path=None, fields=[]):
+def extract_fields_from_json(input_path, output_path=None, fields=[], stream=False, output_format='json'):
     """
     从 JSON 文件中提取指定字段，保存为新 JSON 文件。
 
@@ -9,17 +11,27 @@ def extract_fields_from_json(input_path, output_path=None, fields=[]):
         input_path (str): 原始 JSON 文件路径
         output_path (str): 输出 JSON 文件路径
         fields (list): 要提取的字段名列表
+        stream (bool): 流式模式，逐个读取数组元素，不把整个文件和结果载入内存；
+            有 output_path 时边读边写并返回写出的条数，否则返回生成器（见 iter_fields_from_json）
+        output_format (str): 流式模式的输出格式，'json'（紧凑 JSON 数组）或 'ndjson'（每行一条）
     """
+    if stream:
+        records = iter_fields_from_json(input_path, fields)
+        if not output_path:
+            return records
+        if output_format == 'ndjson':
+            return write_jsonl(records, output_path)
+        if output_format == 'json':
+            return write_json_array(records, output_path)
+        raise ValueError(f"Unknown output format {output_format!r}, choose 'json' or 'ndjson'")
+
     with open(input_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     result = []
 
     for item in data:
-        entry = {}
-        for field in fields:
-            if field in item:
-                entry[field] = item[field]
+        entry = project_fields(item, fields)
         if entry:
             result.append(entry)
     if output_path:
@@ -29,4 +41,132 @@ def extract_fields_from_json(input_path, output_path=None, fields=[]):
     return result
 
 
+def project_fields(item, fields):
+    """只保留 fields 中存在的字段；没有任何字段时返回空字典。"""
+    return {field: item[field] for field in fields if field in item}
+
+
+def iter_fields_from_json(input_path, fields):
+    """
+    extract_fields_from_json 的流式版本：逐个读取数组元素，依次产出提取后的记录（跳过空记录）。
+
+    内存占用与文件大小无关，只取决于读取块大小和单个元素的大小。
+    """
+    for item in iter_json_array(input_path):
+        entry = project_fields(item, fields)
+        if entry:
+            yield entry
+
+
+NUMBER_CHARS = set('0123456789.eE+-')
+WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(input_path, chunk_size=64 * 1024):
+    """
+    逐个读取 JSON 数组中的元素，不把整个文件载入内存。
+
+    参数:
+        input_path (str): JSON 文件路径，顶层必须是数组
+        chunk_size (int): 每次读取的字符数
+    """
+    decoder = json.JSONDecoder()
+    with open(input_path, 'r', encoding='utf-8') as f:
+        buffer, pos = '', 0
+
+        def fill():
+            nonlocal buffer, pos
+            more = f.read(chunk_size)
+            buffer, pos = buffer[pos:] + more, 0
+            return bool(more)
+
+        def next_char():
+            nonlocal pos
+            while True:
+                pos = WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ''
+
+        if next_char() != '[':
+            raise ValueError(f"{input_path}: top-level JSON value is not an array")
+        pos += 1
+        if next_char() == ']':
+            return
+
+        while True:
+            next_char()
+            start = pos
+            try:
+                item, end = decoder.raw_decode(buffer, start)
+            except json.JSONDecodeError:
+                # 元素不完整，继续读取
+                if not fill():
+                    raise
+                continue
+
+            # 元素之后应是 ',' 或 ']'；缓冲区在元素末尾截断时（如数字 "1." 后接 "5"）读取更多再重新解析
+            # 只查看下一个非空白字符，不复制缓冲区剩余部分
+            rest = WHITESPACE.match(buffer, end).end()
+            if rest == len(buffer) or (buffer[rest] not in ',]' and set(buffer[end:]) <= NUMBER_CHARS):
+                if fill():
+                    continue
+                if rest == len(buffer):
+                    raise ValueError(f"{input_path}: unexpected end of JSON array")
+            yield item
+            pos = end
+
+            separator = next_char()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"{input_path}: expected ',' or ']' at offset {pos}")
+            pos += 1
 
+
+def write_jsonl(records, output_path):
+    """
+    逐行写出 JSON Lines 文件，records 可以是生成器；先写临时文件再替换。
+
+    返回写出的行数。
+    """
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def write_json_array(records, output_path):
+    """
+    逐条写出紧凑 JSON 数组（无缩进），records 可以是生成器；先写临时文件再替换。
+
+    返回写出的条数。
+    """
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            count += 1
+        f.write(']\n')
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def iter_jsonl(input_path):
+    """逐行读取 JSON Lines 文件，跳过空行。"""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,151 @@
+# utils/link_utils.py
+import re
+from urllib.parse import urljoin, urlparse, unquote
+
+from utils.http_utils import probe_links
+from utils.page import fetch_page
+from utils.text_utils import clean_texts, sanitize_filename, sanitize_filenames
+
+
+def extract_filename_from_url(url):
+    """Extract the filename from a URL, if present."""
+    if not url:
+        return None
+
+    # Parse the URL
+    parsed_url = urlparse(url)
+    # Get the path component
+    path = parsed_url.path
+
+    # URL decode the path (handles %20 spaces, etc.)
+    path = unquote(path)
+
+    # Split the path by '/' and get the last component
+    path_parts = path.split('/')
+    last_part = path_parts[-1] if path_parts else ""
+
+    # If the last part has a file extension or looks like a filename, return it
+    if last_part and ('.' in last_part or re.search(r'[a-zA-Z0-9_-]+$', last_part)):
+        # Remove any query string or fragment
+        filename = last_part.split('?')[0].split('#')[0]
+        # Clean the filename for use as an actual filename
+        filename = sanitize_filename(filename)
+        return filename
+
+    # If no obvious filename is found
+    return None
+
+
+def build_link_record(link_data, safe_text):
+    """Attach the filename-safe text and the filename to a probed link."""
+    # Add the filename-safe version of the text
+    link_data["safe_text"] = safe_text
+
+    # Prefer the real filename sent with the probe response (Content-Disposition),
+    # URLs like servlet_FileDownload or ViewDoc.aspx say nothing about the document
+    if link_data.get("content_filename"):
+        filename = sanitize_filename(link_data["content_filename"])
+    else:
+        # Extract filename from URL
+        filename = extract_filename_from_url(link_data["file_url"])
+    link_data["filename"] = filename
+
+    return link_data
+
+
+def collect_link_candidates(anchors, url, unique_urls):
+    """Collect (href, raw_text, safe_text) for anchors worth probing, in page order."""
+    kept = []
+    for link in anchors:
+        href = link.get('href')
+
+        # Skip empty or javascript links
+        if not href or href.startswith('javascript:') or href == '#':
+            continue
+
+        # Create absolute URL
+        absolute_url = urljoin(url, href)
+
+        # Skip if we've already processed this URL
+        if absolute_url in unique_urls:
+            continue
+
+        unique_urls.add(absolute_url)
+        kept.append((href, link.text))
+
+    # Clean and sanitize the link texts of the kept anchors in one batch each; the
+    # filename-safe versions come from the raw texts, so blank anchors still become 'unnamed_file'
+    texts = [text for _, text in kept]
+    raw_texts = clean_texts(texts)
+    safe_texts = sanitize_filenames(texts)
+    return [(href, raw_text, safe_text) for (href, _), raw_text, safe_text in zip(kept, raw_texts, safe_texts)]
+
+
+def page_link_candidates(soup, url):
+    """All probe-worthy anchors of a parsed page; plain data, safe to return from a worker process."""
+    # Find all anchor tags with href attribute
+    return collect_link_candidates(soup.find_all('a', href=True), url, set())
+
+
+def known_type_links(candidates, probed):
+    """Join probe results with their candidates, keeping only links with known file types."""
+    links = []
+    for (_, _, safe_text), link_data in zip(candidates, probed):
+        link_data = build_link_record(link_data, safe_text)
+
+        # Only include links with known file types
+        if link_data["file_type"] != "unknown":
+            links.append(link_data)
+
+    return links
+
+
+def extract_all_links(url, headers=None, max_workers=None, client=None, cache=None, page=None,
+                      prober=None):
+    """Extract all links from a webpage, excluding those with unknown file types."""
+    try:
+        # Reuse an already fetched and parsed page when one is given
+        page = page or fetch_page(url, headers, client)
+        candidates = page_link_candidates(page.soup, url)
+
+        # Probe all links concurrently; results keep the page order
+        probed = probe_links([(href, raw_text) for href, raw_text, _ in candidates],
+                             headers, url, max_workers=max_workers, client=client, cache=cache,
+                             prober=prober)
+
+        return known_type_links(candidates, probed)
+
+    except Exception as e:
+        print(f"Error extracting links from {url}: {str(e)}")
+        return []
+
+
+def extract_links_from_tables(url, headers=None, max_workers=None, client=None, cache=None, page=None,
+                              prober=None):
+    """Extract links specifically from tables in the webpage, excluding those with unknown file types."""
+    try:
+        page = page or fetch_page(url, headers, client)
+        soup = page.soup
+
+        unique_urls = set()
+
+        # Find all links within all tables
+        candidates = []
+        for table in soup.find_all('table'):
+            candidates.extend(collect_link_candidates(table.find_all('a', href=True), url, unique_urls))
+
+        # Probe all table links concurrently; results keep the page order
+        probed = probe_links([(href, raw_text) for href, raw_text, _ in candidates],
+                             headers, url, max_workers=max_workers, client=client, cache=cache,
+                             prober=prober)
+
+        table_links = known_type_links(candidates, probed)
+        for link_data in table_links:
+            # Add a flag to indicate this link was found in a table
+            link_data["in_table"] = True
+
+        return table_links
+
+    except Exception as e:
+        print(f"Error extracting table links from {url}: {str(e)}")
+        return []
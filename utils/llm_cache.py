@@ -0,0 +1,118 @@
+# utils/llm_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config.config import llm_cache_path, llm_cache_max_entries, llm_cache_max_bytes
+
+# 每个条目（文档）的分类结果一行；key 由模型、提示词说明、参考文本和条目内容共同决定
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    item_id TEXT,
+    answer TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class ResponseCache:
+    """
+    On-disk (SQLite) cache of parsed LLM classification answers, one row per document.
+
+    Keys come from ``utils.prompt_utils.item_cache_key``, so an answer is reused
+    only while the model, instruction, reference context and the document's own
+    prompt line are unchanged. The least recently used rows are evicted beyond
+    ``max_entries`` rows or ``max_bytes`` of stored answers.
+    """
+
+    def __init__(self, path=None, max_entries=None, max_bytes=None):
+        self.path = path or llm_cache_path
+        self.max_entries = max_entries or llm_cache_max_entries
+        self.max_bytes = max_bytes or llm_cache_max_bytes
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed_at)")
+        self._conn.commit()
+        self._size, self._bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached answer (e.g. ``{'id': ..., 'category': ...}``) or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def put(self, key, answer, item_id=None):
+        data = json.dumps(answer, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM answers WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                (key, item_id, data, size, now, now),
+            )
+            if old:
+                self._bytes -= old[0]
+            else:
+                self._size += 1
+            self._bytes += size
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # 超出条目数或总字节数时按最近访问时间淘汰
+        while self._size > self.max_entries or self._bytes > self.max_bytes:
+            batch = max(1, self._size - self.max_entries)
+            rows = self._conn.execute(
+                "SELECT key, size FROM answers ORDER BY accessed_at LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key, _ in rows])
+            self._size -= len(rows)
+            self._bytes -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def export_stats(self, output_path):
+        """Write ``stats()`` with a timestamp to a JSON file, e.g. for comparing runs."""
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({**self.stats(), "exported_at": time.time()}, f, indent=2)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
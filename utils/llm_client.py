@@ -0,0 +1,196 @@
+# utils/llm_client.py
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import requests
+
+from config.config import (
+    llm_base_url, llm_api_key, llm_model, llm_max_in_flight, llm_requests_per_minute, llm_tokens_per_minute,
+    llm_max_retries, llm_backoff_base, llm_backoff_max, llm_timeout,
+)
+from utils.http_client import HttpClient
+from utils.prompt_utils import get_tokenizer
+
+# 这些状态码视为暂时性错误，退避后重试
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Rate limiter refilled continuously at ``per_minute`` units per minute.
+
+    ``acquire(n)`` blocks until ``n`` units are available; a request larger than
+    the bucket capacity waits for a full bucket instead of blocking forever.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class LLMClient:
+    """
+    OpenAI-compatible chat completion client for concurrent use.
+
+    At most ``max_in_flight`` calls are on the wire at once; requests and prompt
+    tokens per minute are limited by token buckets; 429 and 5xx answers and
+    connection errors are retried with full-jitter exponential backoff (or the
+    server's ``Retry-After``), waiting at most ``backoff_max`` seconds.
+    """
+
+    def __init__(self, base_url=None, api_key=None, model=None, max_in_flight=None, requests_per_minute=None,
+                 tokens_per_minute=None, max_retries=None, backoff_base=None, backoff_max=None, timeout=None,
+                 tokenizer=None):
+        self.base_url = (base_url or llm_base_url).rstrip('/')
+        self.model = model or llm_model
+        self.max_retries = llm_max_retries if max_retries is None else max_retries
+        self.backoff_base = backoff_base or llm_backoff_base
+        self.backoff_max = backoff_max or llm_backoff_max
+        self.tokenizer = get_tokenizer(tokenizer)
+
+        api_key = api_key or llm_api_key
+        headers = {'Content-Type': 'application/json'}
+        if api_key:
+            headers['Authorization'] = f'Bearer {api_key}'
+        self.max_in_flight = max_in_flight or llm_max_in_flight
+        self.http = HttpClient(headers=headers, pool_maxsize=self.max_in_flight, timeout=timeout or llm_timeout)
+
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._request_bucket = TokenBucket(requests_per_minute or llm_requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute or llm_tokens_per_minute)
+
+        self._lock = threading.Lock()
+        self.counts = {'requests': 0, 'retries': 0, 'failures': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                       'cached_tokens': 0}
+        self.latencies = []
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.replace('.', '', 1).isdigit():
+            # 服务器给出的等待时间同样不超过 backoff_max，异常的大值不会让线程长时间阻塞
+            return min(float(retry_after), self.backoff_max)
+        # full jitter：在 [0, min(上限, base * 2^attempt)] 内随机等待，避免并发请求同时重试
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, path, body, tokens=0):
+        """
+        POST a JSON body with rate limiting and retries.
+
+        :return: (status code, parsed JSON body or None); the last answer is returned
+                 when retries are exhausted, connection errors are raised
+        """
+        self._count('prompt_tokens', tokens)
+
+        for attempt in range(self.max_retries + 1):
+            # 每次发送（包括重试）都计入请求数和 token 限额，429 后的重试同样受限速约束
+            self._request_bucket.acquire(1)
+            self._token_bucket.acquire(tokens)
+            response = None
+            with self._in_flight:
+                start = time.perf_counter()
+                self._count('requests')
+                try:
+                    response = self.http.post(f"{self.base_url}{path}", json=body)
+                except requests.RequestException:
+                    if attempt == self.max_retries:
+                        self._count('failures')
+                        raise
+                latency = time.perf_counter() - start
+
+            if response is not None and response.status_code not in RETRY_STATUS:
+                with self._lock:
+                    self.latencies.append(latency)
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = None
+                if response.ok and payload:
+                    usage = payload.get('usage') or {}
+                    self._count('completion_tokens', usage.get('completion_tokens', 0))
+                    # 服务端提示词缓存命中的 token 数（OpenAI: usage.prompt_tokens_details.cached_tokens）
+                    self._count('cached_tokens', (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0))
+                else:
+                    self._count('failures')
+                return response.status_code, payload
+
+            if attempt == self.max_retries:
+                self._count('failures')
+                return response.status_code, None
+            self._count('retries')
+            time.sleep(self.backoff(attempt, response))
+
+    def chat(self, messages, **params):
+        body = {'model': self.model, 'messages': messages, **params}
+        tokens = sum(self.tokenizer.count(message['content']) for message in messages)
+        return self.post('/chat/completions', body, tokens)
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counts = dict(self.counts)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4) if latencies else None
+
+        return {**counts, 'latency_p50': percentile(0.5), 'latency_p95': percentile(0.95),
+                'latency_max': round(latencies[-1], 4) if latencies else None}
+
+
+def run_batch_requests(batch_requests, llm=None, max_workers=None):
+    """
+    Send batch-API request lines (see utils.batch_utils.batch_request) through the interactive endpoint.
+
+    Requests are read lazily: at most ``2 * max_workers`` are submitted and not yet
+    yielded at any time, so memory does not grow with the input.
+
+    :return: iterator of result lines in the batch-API results format, in completion order
+    """
+    llm = llm or LLMClient()
+    max_workers = max_workers or llm.max_in_flight
+
+    def send(request):
+        try:
+            body = dict(request['body'], model=request['body'].get('model') or llm.model)
+            tokens = sum(llm.tokenizer.count(message['content']) for message in body['messages'])
+            # 批量请求的 url 形如 /v1/chat/completions，base_url 已含 /v1
+            path = request.get('url', '/chat/completions')
+            path = path[len('/v1'):] if path.startswith('/v1/') else path
+            status, payload = llm.post(path, body, tokens)
+            error = None if status == 200 and payload else {'status_code': status, 'body': payload}
+            return {'custom_id': request['custom_id'], 'response': {'status_code': status, 'body': payload},
+                    'error': error}
+        except requests.RequestException as e:
+            return {'custom_id': request['custom_id'], 'response': None, 'error': {'message': str(e)}}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = set()
+        for request in batch_requests:
+            if len(running) >= 2 * max_workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            running.add(executor.submit(send, request))
+        for future in as_completed(running):
+            yield future.result()
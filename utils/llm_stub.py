@@ -0,0 +1,184 @@
+# utils/llm_stub.py
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.prompt_utils import ByteEstimator
+
+# 本地替身服务按关键词给出类别，只用于离线测试吞吐与延迟，不代表真实分类质量
+KEYWORD_CATEGORIES = [
+    (('request for proposal', 'rfp', 'solicitation'), 'Request for Proposals (RFP)'),
+    (('contract', 'agreement'), 'Contract'),
+    (('comment',), 'Comment'),
+    (('memorandum', 'mou'), 'Memorandum of Understanding (MOU)'),
+    (('order', 'petition', 'filing', 'psc'), 'Regulatory Filing'),
+    (('guidance', 'policy', 'standard'), 'Policy Guidance'),
+    (('notice', 'webinar', 'announcement'), 'Public Notice'),
+    (('response', 'rfi'), 'Industry Response'),
+]
+
+
+def stub_category(item):
+    text = f"{item.get('text') or ''} {item.get('filename') or ''}".lower()
+    for keywords, category in KEYWORD_CATEGORIES:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return 'Other'
+
+
+def prompt_items(prompt):
+    """The JSON item lines (objects with an ``id``) of a batched prompt."""
+    items = []
+    for line in prompt.splitlines():
+        line = line.strip()
+        if line.startswith('{"id"'):
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                continue
+    return items
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self.send_json(200, {'object': 'list', 'data': [{'id': 'stub', 'object': 'model'}]})
+        else:
+            self.send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_json(404, {'error': {'message': 'not found'}})
+            return
+
+        server.count('requests')
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            server.count('rate_limited')
+            self.send_json(429, {'error': {'message': 'rate limited', 'type': 'rate_limit_error'}},
+                           {'Retry-After': '0.1'})
+            return
+        if roll < server.rate_limit_rate + server.error_rate:
+            server.count('errors')
+            self.send_json(500, {'error': {'message': 'stub server error', 'type': 'server_error'}})
+            return
+
+        prompt = '\n'.join(message.get('content', '') for message in body.get('messages', []))
+        prompt_tokens = server.tokenizer.count(prompt)
+        cached_tokens = server.cached_prefix_tokens(prompt) if server.prompt_cache else 0
+        answer = json.dumps([{'id': item['id'], 'category': stub_category(item)} for item in prompt_items(prompt)])
+        completion_tokens = server.tokenizer.count(answer)
+
+        # 延迟 = 固定延迟 + 按 token 数计的处理时间（命中前缀缓存的部分不计），加上随机抖动
+        delay = server.latency + server.latency_per_1k_tokens * (
+            prompt_tokens - cached_tokens + completion_tokens) / 1000
+        time.sleep(delay * random.uniform(1 - server.jitter, 1 + server.jitter))
+
+        self.send_json(200, {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens,
+                      'prompt_tokens_details': {'cached_tokens': cached_tokens}},
+        })
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local OpenAI-compatible ``/v1/chat/completions`` stand-in.
+
+    :param latency: base seconds per request
+    :param latency_per_1k_tokens: extra seconds per 1000 prompt + completion tokens
+    :param jitter: relative random spread of the delay (0.2 = ±20%)
+    :param error_rate: share of requests answered with 500
+    :param rate_limit_rate: share of requests answered with 429
+    :param prompt_cache: simulate provider prompt caching: the longest prefix of an
+                         earlier prompt, from ``cache_min_tokens`` tokens on in steps
+                         of ``cache_step_tokens``, is reported as cached and adds no latency
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5, latency_per_1k_tokens=0.0, jitter=0.2, error_rate=0.0,
+                 rate_limit_rate=0.0, prompt_cache=True, cache_min_tokens=1024, cache_step_tokens=128):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.prompt_cache = prompt_cache
+        self.cache_min_tokens = cache_min_tokens
+        self.cache_step_tokens = cache_step_tokens
+        self.tokenizer = ByteEstimator()
+        self._lock = threading.Lock()
+        self._prefixes = set()
+        self.counts = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'cached_tokens': 0}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def cached_prefix_tokens(self, prompt):
+        # 按 token 边界对前缀做增量哈希；前缀嵌套，第一次未命中后即可停止查找
+        data = prompt.encode('utf-8')
+        step = self.cache_step_tokens * self.tokenizer.bytes_per_token
+        boundaries = range(self.cache_min_tokens * self.tokenizer.bytes_per_token, len(data) + 1, step)
+        digest = hashlib.sha1()
+        digests, position = [], 0
+        for boundary in boundaries:
+            digest.update(data[position:boundary])
+            position = boundary
+            digests.append((boundary, digest.copy().hexdigest()))
+
+        cached = 0
+        with self._lock:
+            for boundary, prefix in digests:
+                if prefix not in self._prefixes:
+                    break
+                cached = boundary // self.tokenizer.bytes_per_token
+            if len(self._prefixes) > 100000:
+                self._prefixes.clear()
+            self._prefixes.update(prefix for _, prefix in digests)
+        self.count('cached_tokens', cached)
+        return cached
+
+    def handle_error(self, request, client_address):
+        # 客户端超时断开等情况不打印堆栈
+        pass
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def serve(host='127.0.0.1', port=0, **options):
+    """Start a StubServer in a background thread; ``port=0`` picks a free port (see ``server.base_url``)."""
+    server = StubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
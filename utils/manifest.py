@@ -0,0 +1,74 @@
+# utils/manifest.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def hash_bytes(*parts):
+    """SHA-256 over one or more byte strings (length-prefixed so part boundaries matter)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def hash_files(*paths):
+    parts = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            parts.append(f.read())
+    return hash_bytes(*parts)
+
+
+class Manifest:
+    """
+    Records, per key (e.g. year) and stage, the hash of the stage inputs and the
+    files it produced. A stage whose input hash is unchanged and whose outputs
+    still exist can be skipped on the next run.
+    """
+
+    def __init__(self, path='data/manifest.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, key, stage):
+        with self._lock:
+            return self.entries.get(str(key), {}).get(stage)
+
+    def is_fresh(self, key, stage, input_hash, outputs=None):
+        """
+        :param outputs: expected output paths; when given, a stage that recorded a
+                        different set of outputs (e.g. before a new output was added) is stale
+        """
+        entry = self.get(key, stage)
+        return bool(
+            entry
+            and entry['input_hash'] == input_hash
+            and (outputs is None or sorted(outputs) == sorted(entry['outputs']))
+            and all(os.path.exists(path) for path in entry['outputs'])
+        )
+
+    def record(self, key, stage, input_hash, outputs, **extra):
+        with self._lock:
+            self.entries.setdefault(str(key), {})[stage] = {
+                'input_hash': input_hash,
+                'outputs': list(outputs),
+                'updated_at': time.time(),
+                **extra,
+            }
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # 先写临时文件再替换，避免中断时损坏清单
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,90 @@
+# utils/page.py
+import os
+
+from utils.html_parser import parse_html
+from utils.http_client import get_client
+
+
+class Page:
+    """
+    A web page fetched once and parsed once.
+
+    Every extractor (links, table links, plain text, structured sections) and
+    the snapshot writer read from the same ``content`` bytes and the same
+    ``soup``; extractors must treat the soup as read-only.
+    """
+
+    def __init__(self, url, content, encoding=None, parser=None):
+        self.url = url
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.parser = parser
+        self._text = None
+        self._soup = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+    @property
+    def soup(self):
+        # 只解析一次，供所有提取器共享
+        if self._soup is None:
+            self._soup = parse_html(self.text, self.parser)
+        return self._soup
+
+    def save_snapshot(self, output_dir='./snaps', filename='snapshot.html'):
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, filename)
+
+        # 直接写入原始字节，与解析所用内容完全一致
+        with open(file_path, 'wb') as f:
+            f.write(self.content)
+
+        print(f"Snapshot saved to {file_path}")
+        return file_path
+
+
+def fetch_page(url, headers=None, client=None, parser=None):
+    """Download a page once and wrap it in a Page; raises on HTTP errors."""
+    client = client or get_client()
+    response = client.get(url, headers=headers)
+    response.raise_for_status()
+
+    # 与 response.text 相同的编码选择规则
+    encoding = response.encoding or response.apparent_encoding
+    return Page(url, response.content, encoding, parser)
+
+
+def fetch_page_if_changed(url, headers=None, client=None, etag=None, last_modified=None, parser=None):
+    """
+    Conditional page fetch with If-None-Match / If-Modified-Since.
+
+    :return: (Page, validators), with Page None when the server answers 304 Not Modified
+    """
+    client = client or get_client()
+    request_headers = dict(headers or {})
+    if etag:
+        request_headers['If-None-Match'] = etag
+    if last_modified:
+        request_headers['If-Modified-Since'] = last_modified
+
+    response = client.get(url, headers=request_headers)
+    validators = {
+        'etag': response.headers.get('ETag', etag),
+        'last_modified': response.headers.get('Last-Modified', last_modified),
+    }
+    if response.status_code == 304:
+        return None, validators
+
+    response.raise_for_status()
+    encoding = response.encoding or response.apparent_encoding
+    return Page(url, response.content, encoding, parser), validators
+
+
+def load_page(url, path, encoding='utf-8', parser=None):
+    """Build a Page from a saved snapshot, e.g. data/snaps/<year>.html."""
+    with open(path, 'rb') as f:
+        return Page(url, f.read(), encoding, parser)
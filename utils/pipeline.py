@@ -0,0 +1,105 @@
+# utils/pipeline.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.link_utils import extract_all_links, extract_links_from_tables, page_link_candidates
+from utils.http_utils import LinkProber, extract_page_text, extract_text_from_url
+from utils.page import Page, fetch_page
+from utils.structure_utils import extract_structured_content
+
+EXTRACTORS = ('links', 'table_links', 'text', 'structured')
+
+
+def process_page(url, headers=None, snapshot_dir=None, snapshot_name=None, extractors=EXTRACTORS,
+                 keep_header_footer=False, client=None, cache=None, max_workers=None, page=None):
+    """
+    Fetch a page once, parse it once and run the selected extractors on it.
+
+    :param snapshot_dir: if given, the page bytes are saved there as ``snapshot_name``
+    :param extractors: subset of EXTRACTORS to run
+    :return: dict with ``page``, ``probe_stats`` and one entry per extractor that ran
+             (``structured`` also adds ``link_stats``)
+    """
+    page = page or fetch_page(url, headers, client)
+    result = {'page': page}
+
+    # 所有提取器共用一个探测器，同一 URL 在本次运行中只探测一次
+    prober = LinkProber(headers, client=client, cache=cache, max_workers=max_workers)
+
+    # 快照与各提取器共用同一份字节
+    if snapshot_dir:
+        page.save_snapshot(snapshot_dir, snapshot_name or 'snapshot.html')
+
+    if 'links' in extractors:
+        result['links'] = extract_all_links(url, headers, max_workers=max_workers,
+                                            client=client, cache=cache, page=page, prober=prober)
+    if 'table_links' in extractors:
+        result['table_links'] = extract_links_from_tables(url, headers, max_workers=max_workers,
+                                                          client=client, cache=cache, page=page, prober=prober)
+    if 'text' in extractors:
+        result['text'] = extract_text_from_url(url, headers, keep_header_footer=keep_header_footer, page=page)
+    if 'structured' in extractors:
+        result['structured'], result['link_stats'] = extract_structured_content(
+            url, headers, client=client, page=page, cache=cache, max_workers=max_workers, prober=prober)
+
+    result['probe_stats'] = prober.stats()
+    return result
+
+
+def parse_page_content(url, content, encoding=None, parser=None, keep_header_footer=False):
+    """
+    CPU-bound half of the page pipeline: parse once, return link candidates and plain text.
+
+    Takes and returns plain data only, so it can run in a ProcessPoolExecutor.
+    """
+    page = Page(url, content, encoding, parser)
+    return {
+        'candidates': page_link_candidates(page.soup, url),
+        'text': extract_page_text(page.soup, keep_header_footer=keep_header_footer),
+    }
+
+
+def run_dag(keys, stages, run_stage, max_workers):
+    """
+    Run the same stage DAG for several independent keys (e.g. years) on a thread pool.
+
+    A stage starts as soon as its dependencies for the same key have finished, so
+    stages of different keys overlap freely. When a stage fails, the stages that
+    depend on it are skipped for that key only.
+
+    :param keys: independent units of work
+    :param stages: dict stage name -> tuple of dependency stage names
+    :param run_stage: callable(key, stage, dep_results) -> result, dep_results maps dependency -> result
+    :return: (results, errors, skipped); results/errors are keyed by (key, stage)
+    """
+    results, errors, skipped = {}, {}, []
+    pending = [(key, stage) for key in keys for stage in stages]
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for task in list(pending):
+                key, stage = task
+                deps = stages[stage]
+                if any((key, dep) in errors or (key, dep) in skipped for dep in deps):
+                    pending.remove(task)
+                    skipped.append(task)
+                elif all((key, dep) in results for dep in deps):
+                    pending.remove(task)
+                    dep_results = {dep: results[(key, dep)] for dep in deps}
+                    running[executor.submit(run_stage, key, stage, dep_results)] = task
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Unresolvable stage dependencies: {pending}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    results[task] = future.result()
+                except Exception as e:
+                    print(f"[Error] Stage {task[1]} failed for {task[0]}: {e}")
+                    errors[task] = e
+
+    return results, errors, skipped
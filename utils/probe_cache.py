@@ -0,0 +1,216 @@
+# utils/probe_cache.py
+import os
+import sqlite3
+import threading
+import time
+
+from config.config import probe_cache_path, probe_cache_ttl, probe_cache_max_entries
+
+# 缓存表结构：每个规范化 URL 一行
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    url TEXT PRIMARY KEY,
+    file_type TEXT NOT NULL,
+    file_url TEXT,
+    redirect_url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    probed_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    filename TEXT,
+    mime_type TEXT,
+    size INTEGER,
+    probe_version INTEGER
+)
+"""
+
+# 旧版本缓存文件中缺少的列：列名 -> 类型
+ADDED_COLUMNS = {"filename": "TEXT", "mime_type": "TEXT", "size": "INTEGER", "probe_version": "INTEGER"}
+
+# 写入条目时的探测版本；旧条目为 NULL。
+# 2：ZIP / OLE 容器已经过 inspect_container 细分，仍为容器类型说明无法细分，不必重复探测
+PROBE_VERSION = 2
+
+# 门户中间页 -> 真实文件地址
+REDIRECT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS redirects (
+    url TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    resolved_at REAL NOT NULL,
+    accessed_at REAL
+)
+"""
+
+# 旧版本缓存文件的 redirects 表缺少的列
+REDIRECT_ADDED_COLUMNS = {"accessed_at": "REAL"}
+
+FIELDS = ["url", "file_type", "file_url", "redirect_url", "etag", "last_modified", "probed_at", "accessed_at",
+          "filename", "mime_type", "size", "probe_version"]
+
+
+class ProbeCache:
+    """
+    On-disk (SQLite) cache of link probe results keyed by canonical URL.
+
+    Entries younger than ``ttl`` seconds are served as-is; older entries that
+    carry an ETag/Last-Modified can be revalidated with a conditional request.
+    The least recently used entries are evicted beyond ``max_entries``; resolved
+    redirects are kept in their own table under the same bound.
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path or probe_cache_path
+        self.ttl = probe_cache_ttl if ttl is None else ttl
+        self.max_entries = max_entries or probe_cache_max_entries
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        # 探测在线程池中并发执行，连接在线程间共享，由锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.execute(REDIRECT_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(probes)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE probes ADD COLUMN {column} {column_type}")
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(redirects)")}
+        for column, column_type in REDIRECT_ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE redirects ADD COLUMN {column} {column_type}")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+        self._redirect_size = self._conn.execute("SELECT COUNT(*) FROM redirects").fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.redirect_hits = 0
+
+    def get(self, url):
+        """Return the cached entry for ``url`` (with a ``fresh`` flag) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM probes WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            entry = dict(zip(FIELDS, row))
+            entry["fresh"] = time.time() - entry["probed_at"] < self.ttl
+
+            # 过期且无校验信息的条目无法重新验证，直接删除
+            if not entry["fresh"] and not (entry["etag"] or entry["last_modified"]):
+                self._conn.execute("DELETE FROM probes WHERE url = ?", (url,))
+                self._conn.commit()
+                self._size -= 1
+                self.misses += 1
+                return None
+
+            if entry["fresh"]:
+                self.hits += 1
+            else:
+                self.stale += 1
+            self._conn.execute("UPDATE probes SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            return entry
+
+    def put(self, url, file_type, file_url, redirect_url=None, etag=None, last_modified=None,
+            filename=None, mime_type=None, size=None):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM probes WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO probes ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                (url, file_type, file_url, redirect_url, etag, last_modified, now, now, filename, mime_type, size,
+                 PROBE_VERSION),
+            )
+            if not exists:
+                self._size += 1
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url):
+        """Mark an entry as freshly validated (after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE probes SET probed_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+            self.revalidated += 1
+
+    def get_redirect(self, url):
+        """Resolved redirect target of an interstitial URL, None if unknown or older than ``ttl``."""
+        with self._lock:
+            row = self._conn.execute("SELECT target, resolved_at FROM redirects WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM redirects WHERE url = ?", (url,))
+                self._conn.commit()
+                self._redirect_size -= 1
+                return None
+            self.redirect_hits += 1
+            self._conn.execute("UPDATE redirects SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+            return row[0]
+
+    def put_redirect(self, url, target):
+        now = time.time()
+        with self._lock:
+            # 写入时顺带清除所有过期的跳转，不必等到再次查询
+            expired = self._conn.execute("DELETE FROM redirects WHERE resolved_at <= ? AND url != ?",
+                                         (now - self.ttl, url)).rowcount
+            self._redirect_size -= expired
+            exists = self._conn.execute("SELECT 1 FROM redirects WHERE url = ?", (url,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO redirects (url, target, resolved_at, accessed_at) "
+                               "VALUES (?, ?, ?, ?)", (url, target, now, now))
+            if not exists:
+                self._redirect_size += 1
+            self._evict_redirects()
+            self._conn.commit()
+
+    def _evict(self):
+        # 超出容量时按最近访问时间淘汰
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM probes WHERE url IN (SELECT url FROM probes ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._size -= overflow
+            self.evictions += overflow
+
+    def _evict_redirects(self):
+        # 跳转表与探测表使用相同的容量上限；旧文件中 accessed_at 为 NULL 的行最先淘汰
+        overflow = self._redirect_size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM redirects WHERE url IN (SELECT url FROM redirects ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._redirect_size -= overflow
+            self.evictions += overflow
+
+    def stats(self):
+        lookups = self.hits + self.stale + self.misses
+        answered = self.hits + self.revalidated
+        return {
+            "entries": self._size,
+            "redirect_entries": self._redirect_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "redirect_hits": self.redirect_hits,
+            "hit_rate": round(answered / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,302 @@
+# utils/prompt_utils.py
+import hashlib
+import importlib.util
+import json
+import math
+
+from config.config import (
+    prompt_max_tokens, prompt_reference_max_tokens, prompt_tokenizer, bytes_per_token as default_bytes_per_token,
+    llm_model,
+)
+from utils.manifest import hash_bytes
+
+CATEGORIES = [
+    "Request for Proposals (RFP)",
+    "Contract",
+    "Comment",
+    "Memorandum of Understanding (MOU)",
+    "Regulatory Filing",
+    "Policy Guidance",
+    "Public Notice",
+    "Industry Response",
+    "Other",
+]
+
+# 分批提示词：每个条目带稳定的 id，模型只需返回 id 和 category，便于与原始链接对应
+BATCH_INSTRUCTION = (
+    "You are given a list of documents, one JSON object per line. Each item includes an `id`, "
+    "a `text` field (the display title) and a `filename` field (the linked file name). "
+    "Your task is to classify each document into **one of the following categories**:\n\n"
+    + "".join(f"• {category}\n" for category in CATEGORIES) + "\n"
+    "Use both the `text` and `filename` fields to infer the category, and refer to the reference context provided "
+    "before the data. If the information is insufficient or ambiguous, choose `Other`.\n\n"
+    "Return a JSON array with one object per item. Each object must include the item's `id` "
+    "and a `category` field. Example:\n"
+    "{\"id\": \"2018-0a1b2c3d4e5f\", \"category\": \"Policy Guidance\"}"
+)
+
+# 条目中传给模型的字段：输出字段名 -> 链接记录中的候选字段（依次取第一个非空值）
+ITEM_FIELDS = {
+    'text': ('text', 'safe_text'),
+    'filename': ('filename',),
+}
+
+
+class ByteEstimator:
+    """Token count estimated from the UTF-8 length; no tokenizer needed."""
+
+    def __init__(self, bytes_per_token=None):
+        self.bytes_per_token = bytes_per_token or default_bytes_per_token
+
+    def count(self, text):
+        return math.ceil(len(text.encode('utf-8')) / self.bytes_per_token)
+
+    def truncate(self, text, max_tokens):
+        data = text.encode('utf-8')
+        limit = max_tokens * self.bytes_per_token
+        return text if len(data) <= limit else data[:limit].decode('utf-8', errors='ignore')
+
+
+class TiktokenCounter:
+    """Exact token counts with a local tiktoken encoding (optional dependency)."""
+
+    def __init__(self, encoding='cl100k_base'):
+        import tiktoken
+        self.encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text):
+        return len(self.encoding.encode(text))
+
+    def truncate(self, text, max_tokens):
+        tokens = self.encoding.encode(text)
+        return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+
+
+def get_tokenizer(name=None):
+    """
+    Token counter by name: ``bytes`` (estimate) or ``tiktoken[:<encoding>]``.
+
+    Anything with ``count(text)`` and ``truncate(text, max_tokens)`` can be passed
+    instead of a name wherever a tokenizer is accepted.
+    """
+    name = name or prompt_tokenizer
+    if not isinstance(name, str):
+        return name
+    if name == 'bytes':
+        return ByteEstimator()
+    if name.split(':', 1)[0] == 'tiktoken':
+        if importlib.util.find_spec('tiktoken') is None:
+            raise ValueError("Tokenizer 'tiktoken' is not installed, use 'bytes' or install tiktoken")
+        encoding = name.split(':', 1)[1] if ':' in name else 'cl100k_base'
+        return TiktokenCounter(encoding)
+    raise ValueError(f"Unknown tokenizer {name!r}, choose 'bytes' or 'tiktoken[:<encoding>]'")
+
+
+def item_id(link, year):
+    """Stable id of a link record: year plus a hash of its page URL, independent of link order."""
+    return f"{year}-{hashlib.sha1(link['url'].encode('utf-8')).hexdigest()[:12]}"
+
+
+def prompt_item(link, year):
+    item = {'id': item_id(link, year)}
+    for field, sources in ITEM_FIELDS.items():
+        item[field] = next((link[source] for source in sources if link.get(source)), None)
+    return item
+
+
+def serialize_item(item):
+    # 紧凑 JSON：无缩进、无多余空格，保留非 ASCII 字符
+    return json.dumps(item, ensure_ascii=False, separators=(',', ':'))
+
+
+def shared_reference(references):
+    """
+    Boilerplate shared by the reference texts of several years: the non-blank lines
+    that occur in every one of them, in the order of the first, without repeats.
+
+    Empty when fewer than two references are given. The result depends on the set
+    of years, so the prompts change when a year is added (answer cache keys do not,
+    see answer_context_key).
+    """
+    references = list(references)
+    if len(references) < 2:
+        return ''
+    common = set.intersection(*(set(line for line in reference.splitlines() if line.strip())
+                                for reference in references))
+    shared, seen = [], set()
+    for line in references[0].splitlines():
+        if line in common and line not in seen:
+            seen.add(line)
+            shared.append(line)
+    return '\n'.join(shared)
+
+
+def shared_prefix(shared):
+    """The part of the prompt prefix that is the same for every year: instruction and shared reference."""
+    if not shared:
+        return f"{BATCH_INSTRUCTION}\n\n"
+    return f"{BATCH_INSTRUCTION}\n\nHere is the reference context shared by all years:\n{shared}\n\n"
+
+
+def truncate_shared(shared, reference_max_tokens=None, tokenizer=None):
+    """The shared reference as it appears in the prompts; it takes the reference budget first."""
+    tokenizer = get_tokenizer(tokenizer)
+    reference_max_tokens = prompt_reference_max_tokens if reference_max_tokens is None else reference_max_tokens
+    return tokenizer.truncate(shared or '', reference_max_tokens)
+
+
+def render_context(shared, reference):
+    """The cacheable prompt prefix: instruction, shared reference, then the year's own reference."""
+    heading = "Here is the reference context for this year:" if shared else "Here is the reference context:"
+    return f"{shared_prefix(shared)}{heading}\n{reference}\n\n"
+
+
+def answer_context_key(reference, model=None):
+    """
+    Hash of what a cached answer depends on besides the item itself: the model, the
+    instruction and the year's own full reference text. It does not depend on the
+    prompt layout (shared part, truncation), so adding or removing a year keeps the
+    answers of the other years.
+    """
+    return hash_bytes((model or llm_model).encode('utf-8'), BATCH_INSTRUCTION.encode('utf-8'),
+                      reference.encode('utf-8'))
+
+
+def prompt_context(reference, model=None, reference_max_tokens=None, tokenizer=None, shared=None):
+    """
+    The prompt prefix every batch of a year starts with, and the answer cache
+    context key of the year (see answer_context_key).
+
+    With ``shared`` (see shared_reference), its lines are dropped from the year's
+    reference and placed before it, so the prefix up to the end of the shared part
+    is identical for all years. The reference budget covers both parts, the
+    shared part first.
+    """
+    context_key = answer_context_key(reference, model)
+    tokenizer = get_tokenizer(tokenizer)
+    reference_max_tokens = prompt_reference_max_tokens if reference_max_tokens is None else reference_max_tokens
+    if shared:
+        shared = truncate_shared(shared, reference_max_tokens, tokenizer)
+        shared_lines = set(shared.splitlines())
+        reference = '\n'.join(line for line in reference.splitlines() if line not in shared_lines)
+        reference_max_tokens = max(0, reference_max_tokens - tokenizer.count(shared))
+    reference = tokenizer.truncate(reference, reference_max_tokens)
+    return render_context(shared, reference), context_key
+
+
+def item_cache_key(context_key, line):
+    """Answer cache key of one serialized item under a prompt context."""
+    return hash_bytes(context_key.encode('utf-8'), line.encode('utf-8'))
+
+
+def render_prompt(items_block, context):
+    # 固定内容在前、每批不同的数据在后，同一年的各批提示词共享前缀，可命中服务端的提示词缓存
+    return f"{context}Here is the data:\n{items_block}"
+
+
+def iter_prompt_batches(links, reference, year, max_tokens=None, reference_max_tokens=None, tokenizer=None,
+                        cache=None, model=None, pre_classifier=None, stats=None, shared=None):
+    """
+    Pack link records into as few prompts as fit under ``max_tokens`` each.
+
+    Every prompt starts with the same prefix: the instruction, the reference text
+    shared by all years (``shared``, see shared_reference) and the year's own
+    (truncated) reference; the remaining budget is filled with items in page order. An item that does not
+    fit even into an empty prompt gets a prompt of its own. ``links`` may be any
+    iterable and batches are yielded as soon as they are full, so only one batch
+    is held in memory at a time.
+
+    With a ResponseCache (utils.llm_cache), items that already have an answer for
+    the same model, instruction and reference are left out, so only new or changed
+    documents are sent.
+
+    With a pre-classifier (utils.rule_classifier.RuleClassifier), items it answers
+    confidently are left out as well. ``stats``, if given, is a dict filled with
+    item counts (``items``, ``rules``, ``cached``, ``sent``) and ``tokens_sent`` /
+    ``tokens_saved`` against packing every item.
+
+    :return: iterator of dicts with ``batch_id``, ``items``, ``prompt`` and ``tokens``,
+             plus the cacheable prefix: ``prefix_hash``, ``prefix_chars``,
+             ``prefix_tokens`` (shared by the year's batches) and
+             ``shared_prefix_tokens`` (shared by all years)
+    """
+    tokenizer = get_tokenizer(tokenizer)
+    max_tokens = max_tokens or prompt_max_tokens
+
+    context, context_key = prompt_context(reference, model, reference_max_tokens, tokenizer, shared)
+    fixed_tokens = tokenizer.count(render_prompt('', context))
+    available = max_tokens - fixed_tokens
+    if available <= 0:
+        raise ValueError(f"Instruction and reference take {fixed_tokens} tokens, over the budget of {max_tokens}")
+
+    shared_part = shared_prefix(truncate_shared(shared, reference_max_tokens, tokenizer))
+    prefix = {
+        'prefix_hash': hash_bytes(context.encode('utf-8')),
+        'prefix_chars': len(context),
+        'prefix_tokens': tokenizer.count(context),
+        'shared_prefix_tokens': tokenizer.count(shared_part),
+    }
+
+    def batch(index, lines):
+        prompt = render_prompt('\n'.join(line for _, line in lines), context)
+        return {
+            'batch_id': f"{year}-{index:03d}",
+            'items': [item for item, _ in lines],
+            'prompt': prompt,
+            'tokens': tokenizer.count(prompt),
+            **prefix,
+        }
+
+    counts = {'items': 0, 'rules': 0, 'cached': 0, 'sent': 0, 'batches': 0}
+    # 不做任何跳过时的打包结果，用于估算节省的 token（含省掉的批次的固定开销）
+    full_batches, full_current, full_items_tokens = 0, 0, 0
+    sent_items_tokens = 0
+
+    def report():
+        if stats is not None:
+            full_tokens = full_items_tokens + fixed_tokens * (full_batches + (1 if full_current else 0))
+            tokens_sent = sent_items_tokens + fixed_tokens * counts['batches']
+            stats.update(counts, tokens_sent=tokens_sent, tokens_saved=full_tokens - tokens_sent)
+
+    index = 0
+    current, current_tokens = [], 0
+    for link in links:
+        item = prompt_item(link, year)
+        line = serialize_item(item)
+        # 每行末尾的换行符计入
+        item_tokens = tokenizer.count(line + '\n')
+        counts['items'] += 1
+        if full_current and full_current + item_tokens > available:
+            full_batches += 1
+            full_current = 0
+        full_current += item_tokens
+        full_items_tokens += item_tokens
+
+        if pre_classifier is not None and pre_classifier.answer(item) is not None:
+            counts['rules'] += 1
+            continue
+        if cache is not None and cache.get(item_cache_key(context_key, line)) is not None:
+            counts['cached'] += 1
+            continue
+        if current and current_tokens + item_tokens > available:
+            counts['batches'] += 1
+            report()
+            yield batch(index, current)
+            index += 1
+            current, current_tokens = [], 0
+        current.append((item, line))
+        current_tokens += item_tokens
+        counts['sent'] += 1
+        sent_items_tokens += item_tokens
+    if current:
+        counts['batches'] += 1
+        report()
+        yield batch(index, current)
+    report()
+
+
+def build_prompt_batches(links, reference, year, max_tokens=None, reference_max_tokens=None, tokenizer=None,
+                         shared=None):
+    """All prompt batches of a year as a list, see iter_prompt_batches."""
+    return list(iter_prompt_batches(links, reference, year, max_tokens, reference_max_tokens, tokenizer,
+                                    shared=shared))
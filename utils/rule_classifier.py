@@ -0,0 +1,165 @@
+# utils/rule_classifier.py
+import re
+from collections import deque
+
+from config.config import rule_confidence_threshold
+
+# 关键词 -> (类别, 权重)；关键词按规范化后的文本匹配（小写，非字母数字字符视为空格）
+RULES = {
+    # Request for Proposals (RFP)：招标文件及其附件
+    'request for proposals': ('Request for Proposals (RFP)', 0.95),
+    'request for proposal': ('Request for Proposals (RFP)', 0.95),
+    'rfp': ('Request for Proposals (RFP)', 0.7),
+    'orecrfp': ('Request for Proposals (RFP)', 0.6),
+    'appendix': ('Request for Proposals (RFP)', 0.5),
+    'notice of intent to propose': ('Request for Proposals (RFP)', 0.85),
+    'proposal certification form': ('Request for Proposals (RFP)', 0.9),
+    'proposal submission guide': ('Request for Proposals (RFP)', 0.9),
+    'offer data form': ('Request for Proposals (RFP)', 0.85),
+    'master offers form': ('Request for Proposals (RFP)', 0.85),
+    'written questions': ('Request for Proposals (RFP)', 0.8),
+    'summary of revisions': ('Request for Proposals (RFP)', 0.6),
+    'sample calculations': ('Request for Proposals (RFP)', 0.5),
+    # Contract
+    'purchase and sale agreement': ('Contract', 0.9),
+    'contract': ('Contract', 0.8),
+    'agreement': ('Contract', 0.7),
+    # Comment
+    'comments': ('Comment', 0.85),
+    'comment': ('Comment', 0.8),
+    # Memorandum of Understanding (MOU)
+    'memorandum of understanding': ('Memorandum of Understanding (MOU)', 0.95),
+    'mou': ('Memorandum of Understanding (MOU)', 0.9),
+    # Regulatory Filing
+    'order adopting': ('Regulatory Filing', 0.9),
+    'order': ('Regulatory Filing', 0.5),
+    'petition': ('Regulatory Filing', 0.85),
+    'filing': ('Regulatory Filing', 0.8),
+    'public service commission': ('Regulatory Filing', 0.7),
+    'psc': ('Regulatory Filing', 0.6),
+    # Policy Guidance
+    'guidance': ('Policy Guidance', 0.8),
+    'white paper': ('Policy Guidance', 0.7),
+    'policy': ('Policy Guidance', 0.6),
+    'fact sheet': ('Policy Guidance', 0.6),
+    'factsheet': ('Policy Guidance', 0.6),
+    'report': ('Policy Guidance', 0.5),
+    # Public Notice
+    'press release': ('Public Notice', 0.9),
+    'announcement': ('Public Notice', 0.8),
+    'webinar': ('Public Notice', 0.8),
+    'notice': ('Public Notice', 0.6),
+    'presentation slides': ('Public Notice', 0.6),
+    'conference': ('Public Notice', 0.5),
+    # Industry Response：开发商提交的投标书（文件名形如 ...-Proposal-1-Pt-1）
+    **{f'proposal {n}': ('Industry Response', 0.85) for n in range(1, 10)},
+    'response': ('Industry Response', 0.5),
+}
+
+NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Lower-case, every run of non-alphanumeric characters becomes one space, padded with spaces."""
+    return f" {NON_WORD.sub(' ', (text or '').lower()).strip()} "
+
+
+class AhoCorasick:
+    """
+    Multi-keyword matcher: one pass over the text finds every occurrence of every
+    keyword, in time linear in the text length plus the number of matches.
+    """
+
+    def __init__(self, keywords):
+        # 每个状态：转移表、失败指针、在此结束的关键词
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append(keyword)
+
+    def _build(self):
+        # 广度优先计算失败指针，并合并后缀状态的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Yield ``(start, end, keyword)`` for every occurrence, ``end`` exclusive."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                yield index + 1 - len(keyword), index + 1, keyword
+
+
+class RuleClassifier:
+    """
+    Keyword pre-classifier over an item's ``text`` and ``filename``.
+
+    Keywords only count as whole words, and a keyword inside a longer matching
+    keyword (``notice`` in ``notice of intent to propose``) is ignored. Weights
+    of one category combine as a noisy-or; the confidence is the best score
+    discounted by the runner-up: ``best * (1 - second)``.
+    """
+
+    def __init__(self, rules=None, threshold=None):
+        self.rules = rules or RULES
+        self.threshold = rule_confidence_threshold if threshold is None else threshold
+        self.matcher = AhoCorasick(self.rules)
+
+    def matches(self, text):
+        # 关键词两侧必须是空格（normalize 已在首尾补空格），即整词匹配
+        found = [
+            (start, end, keyword) for start, end, keyword in self.matcher.iter_matches(text)
+            if text[start - 1] == ' ' and text[end] == ' '
+        ]
+        return [
+            keyword for start, end, keyword in found
+            if not any(s <= start and end <= e and (s, e) != (start, end) for s, e, _ in found)
+        ]
+
+    def classify(self, item):
+        """:return: (category or None, confidence, matched keywords)"""
+        text = normalize(f"{item.get('text') or ''} {item.get('filename') or ''}")
+        keywords = self.matches(text)
+
+        misses = {}
+        for keyword in set(keywords):
+            category, weight = self.rules[keyword]
+            misses[category] = misses.get(category, 1.0) * (1 - weight)
+        if not misses:
+            return None, 0.0, []
+
+        scores = sorted(((1 - miss, category) for category, miss in misses.items()), reverse=True)
+        best, category = scores[0]
+        second = scores[1][0] if len(scores) > 1 else 0.0
+        return category, round(best * (1 - second), 4), sorted(set(keywords))
+
+    def answer(self, item):
+        """Answer in the LLM answer format when the rules are confident enough, else None."""
+        category, confidence, _ = self.classify(item)
+        if category is None or confidence < self.threshold:
+            return None
+        return {'id': item['id'], 'category': category, 'confidence': confidence}
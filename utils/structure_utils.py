@@ -0,0 +1,286 @@
+# utils/structure_utils.py
+from bs4 import Tag
+
+from utils.http_utils import canonicalize_url, probe_links
+from utils.page import fetch_page
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+# 获取标题的数字级别 (h1 -> 1, h2 -> 2, etc.)
+def get_heading_level(tag):
+    if not tag or not tag.name or not tag.name.startswith('h'):
+        return 0
+    try:
+        return int(tag.name[1])
+    except ValueError:
+        return 0
+
+# 添加链接到统计信息，使用link_tracker跟踪已处理过的链接
+def add_link_to_stats(link_data, section_name, link_tracker, is_table_link=False):
+    # 创建唯一标识符 (使用URL作为唯一标识)
+    link_id = link_data["url"]
+
+    # 如果链接已经计数过，只需更新section级别的统计信息
+    if link_id in link_tracker["counted_links"]:
+        # 只有当这个链接在当前section还未计数时才更新当前section的计数
+        if section_name not in link_tracker["link_sections"].get(link_id, []):
+            if section_name in link_tracker["stats"]["sections"]:
+                link_tracker["stats"]["sections"][section_name]["total_links"] += 1
+                if is_table_link:
+                    link_tracker["stats"]["sections"][section_name]["table_links"] += 1
+                if link_data["is_pdf"]:
+                    link_tracker["stats"]["sections"][section_name]["pdf_links"] += 1
+
+            # 记录此链接已在当前section计数
+            link_tracker["link_sections"][link_id].append(section_name)
+    else:
+        # 新链接：更新全局计数和当前section的计数
+        link_tracker["counted_links"].add(link_id)
+        link_tracker["stats"]["total_links"] += 1
+        if link_data["is_pdf"]:
+            link_tracker["stats"]["pdf_links"] += 1
+
+        # 更新此section的计数
+        if section_name in link_tracker["stats"]["sections"]:
+            link_tracker["stats"]["sections"][section_name]["total_links"] += 1
+            if is_table_link:
+                link_tracker["stats"]["sections"][section_name]["table_links"] += 1
+            if link_data["is_pdf"]:
+                link_tracker["stats"]["sections"][section_name]["pdf_links"] += 1
+
+        # 初始化此链接的section列表
+        link_tracker["link_sections"][link_id] = [section_name]
+
+
+# 创建或获取内容部分
+def get_or_create_section(structured_data, path, link_tracker):
+    current = structured_data
+    for i, section in enumerate(path):
+        if section not in current:
+            current[section] = {
+                "paragraphs": [],
+                "links": [],
+                "tables": [],
+                "subsections": {}
+            }
+
+            # 初始化链接统计
+            full_path = " > ".join(path[:i + 1])
+            link_tracker["stats"]["sections"][full_path] = {
+                "total_links": 0,
+                "pdf_links": 0,
+                "table_links": 0
+            }
+
+        if i < len(path) - 1:
+            if "subsections" not in current[section]:
+                current[section]["subsections"] = {}
+            current = current[section]["subsections"]
+        else:
+            return current[section], " > ".join(path)
+
+    return None, None
+
+
+def new_section():
+    return {
+        "paragraphs": [],
+        "links": [],
+        "tables": [],
+        "subsections": {}
+    }
+
+
+def new_section_stats():
+    return {
+        "total_links": 0,
+        "pdf_links": 0,
+        "table_links": 0
+    }
+
+
+class SectionTreeBuilder:
+    """
+    Single document-order pass that assigns paragraphs, links and tables to sections.
+
+    A heading stack tracks the current section path. Every node is visited once;
+    anchors are only collected during the walk and probed afterwards in one
+    concurrent batch, so each anchor is probed once even when it sits in a table.
+    """
+
+    def __init__(self):
+        self.structured_data = {}
+        self.link_tracker = {
+            "stats": {
+                "total_links": 0,
+                "pdf_links": 0,
+                "sections": {}
+            },
+            "counted_links": set(),  # 用集合存储已计数的链接URL
+            "link_sections": {}  # 记录每个链接已被计数的sections
+        }
+
+        # 第一个标题之前的内容；有标题时命名为 Page Header，否则为 Main Content
+        self.pre_section = new_section()
+        self.section = self.pre_section
+        self.section_name = None
+        self.seen_heading = False
+
+        self.current_path = []
+        self.current_levels = []  # 用于存储每个标题对应的级别
+
+        self.anchors = []  # (href, text)，按文档顺序
+        self.slots = []  # (list, position, anchor index)：探测完成后回填
+        self.link_events = []  # (anchor index, section name, is_table_link)
+
+    def add_anchor(self, link):
+        self.anchors.append((link["href"], link.text.strip()))
+        return len(self.anchors) - 1
+
+    def add_link_slot(self, target, anchor_index):
+        self.slots.append((target, len(target), anchor_index))
+        target.append(None)
+
+    def open_heading(self, heading):
+        if not self.seen_heading:
+            # 保持原有顺序：Page Header 总是第一个区块
+            self.seen_heading = True
+            self.structured_data["Page Header"] = self.pre_section
+            self.link_tracker["stats"]["sections"]["Page Header"] = new_section_stats()
+
+        heading_level = get_heading_level(heading)
+
+        # 根据标题级别更新路径，回退到适当的级别
+        while self.current_levels and heading_level <= self.current_levels[-1]:
+            self.current_path.pop()
+            self.current_levels.pop()
+
+        # 添加当前标题到路径
+        self.current_path.append(heading.text.strip())
+        self.current_levels.append(heading_level)
+
+        self.section, self.section_name = get_or_create_section(
+            self.structured_data, self.current_path, self.link_tracker)
+
+    def add_table(self, table):
+        # 表格内的文本按文档顺序计入段落
+        self.section["paragraphs"].extend(table.stripped_strings)
+
+        # 表格内每个链接只登记一次，单元格链接引用同一个探测结果；
+        # 表格内的所有链接（含 caption、表头中的链接）都计为表格链接
+        anchor_indexes = {}
+        for link in table.find_all('a', href=True):
+            if link.text.strip():
+                anchor_indexes[id(link)] = self.add_anchor(link)
+                self.add_link_slot(self.section["links"], anchor_indexes[id(link)])
+                self.link_events.append((anchor_indexes[id(link)], self.section_name, True))
+
+        # 与原实现的 find_all('table') 相同：嵌套表格在外层表格之后各自再输出一次
+        for nested in [table] + table.find_all('table'):
+            table_data = self.table_rows(nested, anchor_indexes)
+            if table_data:
+                self.section["tables"].append(table_data)
+
+    def table_rows(self, table, anchor_indexes):
+        table_data = []
+        rows = table.find_all('tr')
+
+        # 处理表头
+        headers_row = rows[0] if rows else None
+        table_headers = []
+        if headers_row:
+            table_headers = [th.text.strip() for th in headers_row.find_all(['th'])]
+
+        # 处理表格内容行
+        data_rows = rows[1:] if table_headers else rows
+        for row in data_rows:
+            cells = row.find_all(['td'])
+            row_data = {}
+
+            # 为每个单元格分配表头
+            for idx, cell in enumerate(cells):
+                header_name = table_headers[idx] if idx < len(table_headers) else f"Column {idx + 1}"
+                row_data[header_name] = cell.text.strip()
+
+            # 处理单元格中的链接
+            for idx, cell in enumerate(cells):
+                cell_links = []
+                for link in cell.find_all('a', href=True):
+                    if id(link) in anchor_indexes:
+                        self.add_link_slot(cell_links, anchor_indexes[id(link)])
+
+                if cell_links:
+                    header_name = table_headers[idx] if idx < len(table_headers) else f"Column {idx + 1}"
+                    row_data[f"{header_name}_links"] = cell_links
+
+            table_data.append(row_data)
+
+        return table_data
+
+    def walk(self, root):
+        string_types = root.interesting_string_types
+        stack = [iter(root.contents)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            if isinstance(node, Tag):
+                if node.name in HEADING_TAGS:
+                    self.open_heading(node)
+                    continue
+                if node.name == 'table':
+                    self.add_table(node)
+                    continue
+                if node.name == 'a' and node.has_attr('href') and node.text.strip():
+                    anchor_index = self.add_anchor(node)
+                    self.add_link_slot(self.section["links"], anchor_index)
+                    self.link_events.append((anchor_index, self.section_name, False))
+                stack.append(iter(node.contents))
+
+            elif type(node) in string_types:
+                text = node.strip()
+                if text:
+                    self.section["paragraphs"].append(text)
+
+    def finish(self, probed):
+        if not self.seen_heading:
+            # 如果没有任何标题标签，则整个页面内容归入 Main Content
+            self.structured_data["Main Content"] = self.pre_section
+            self.link_tracker["stats"]["sections"]["Main Content"] = new_section_stats()
+        pre_name = "Page Header" if self.seen_heading else "Main Content"
+
+        # 回填探测结果
+        for target, position, anchor_index in self.slots:
+            target[position] = probed[anchor_index]
+
+        # 按文档顺序统计链接
+        for anchor_index, section_name, is_table_link in self.link_events:
+            add_link_to_stats(probed[anchor_index], section_name or pre_name, self.link_tracker,
+                              is_table_link=is_table_link)
+
+        # 唯一链接数与链接出现总次数
+        stats = self.link_tracker["stats"]
+        stats["unique_links"] = len({canonicalize_url(link["url"]) for link in probed})
+        stats["link_occurrences"] = len(self.anchors)
+
+        return self.structured_data, stats
+
+
+# 主函数：结构化提取网页内容
+def extract_structured_content(url, headers=None, client=None, page=None, cache=None, max_workers=None,
+                               prober=None):
+    # 复用已获取并解析的页面
+    page = page or fetch_page(url, headers, client)
+    soup = page.soup
+
+    builder = SectionTreeBuilder()
+    builder.walk(soup.body or soup)
+
+    # 所有链接在遍历结束后统一并发探测
+    probed = probe_links(builder.anchors, headers, url, max_workers=max_workers, client=client, cache=cache,
+                         prober=prober)
+
+    return builder.finish(probed)
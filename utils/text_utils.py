@@ -1,5 +1,17 @@
 import re
 
+# 预编译的模式，模块加载时构建一次
+# str.split() / str.strip() 认定的空白字符与正则 \s 完全相同，可以代替 re.sub(r'\s+', ' ', ...)
+PARAGRAPH_BREAK = re.compile(r'\n{2,}')
+SPACE_RUN = re.compile(r' {2,}')
+# 段落内部只合并这些空白（保留单个换行），先逐个换成空格；
+# 少数几个字符时 str.replace 比 str.translate 查表快得多
+INLINE_SPACES = ('\xa0', '\t', '\r', '\f', '\v')
+# 文件名中不合法的字符、空白、句点、逗号、分号、括号以及已有的下划线：
+# 按连续的这类字符切分，再用单个下划线连接
+FILENAME_SEPARATORS = re.compile(r'[\s\\/*?:"<>|.,;()_]+')
+FILENAME_MAX_LENGTH = 100
+
 
 def clean_text(text):
     """
@@ -10,17 +22,12 @@ def clean_text(text):
     if not text:
         return ""
 
-    # Replace non-breaking space (various representations) with regular space
-    text = text.replace('\xa0', ' ')  # Unicode NBSP
-    text = text.replace('&nbsp;', ' ')  # HTML entity
-
-    # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
-
-    # Strip leading and trailing whitespace
-    text = text.strip()
+    # NBSP 本身是空白字符，由 split() 处理；HTML 实体需要先替换
+    if '&nbsp;' in text:
+        text = text.replace('&nbsp;', ' ')
 
-    return text
+    # 一次切分即合并连续空白并去掉首尾空白
+    return ' '.join(text.split())
 
 
 def clean_text_preserve_paragraphs(text):
@@ -32,25 +39,64 @@ def clean_text_preserve_paragraphs(text):
     if not text:
         return ""
 
-    # 替换常见的NBSP空格
-    text = text.replace('\xa0', ' ')
-    text = text.replace('&nbsp;', ' ')
+    # 替换常见的NBSP空格，同时把段落内要合并的空白都换成空格
+    for char in INLINE_SPACES:
+        if char in text:
+            text = text.replace(char, ' ')
+    if '&nbsp;' in text:
+        text = text.replace('&nbsp;', ' ')
+
+    # 将多个空格合并成一个（保留换行）；合并不影响按换行分段，可以对全文一次完成
+    if '  ' in text:
+        text = SPACE_RUN.sub(' ', text)
+
+    # 用两个及以上换行分段，去除段落开头结尾的空格和换行，忽略空段落，再用两个换行拼接
+    return '\n\n'.join(filter(None, [para.strip() for para in PARAGRAPH_BREAK.split(text)]))
+
+
+def sanitize_filename(text):
+    """Convert text to a safe filename format."""
+    if not text:
+        return ""
+
+    # 一次切分完成：不合法字符和空白换成下划线、合并连续下划线、去掉首尾下划线
+    if '&nbsp;' in text:
+        text = text.replace('&nbsp;', ' ')
+    text = '_'.join(filter(None, FILENAME_SEPARATORS.split(text)))
+
+    # Truncate to reasonable length for a filename (max 100 chars)
+    text = text[:FILENAME_MAX_LENGTH]
+
+    # If nothing left after sanitizing, return a default
+    return text or "unnamed_file"
+
+
+def normalize_batch(normalize, texts):
+    """
+    Apply one of the normalizers above to a list of strings at once.
+
+    Repeated strings (link labels such as "[PDF]", repeated table cells) are only
+    normalized once.
+
+    :return: list of normalized strings, in the order of ``texts``
+    """
+    done = {}
+    result = []
+    for text in texts:
+        cleaned = done.get(text)
+        if cleaned is None:
+            cleaned = done[text] = normalize(text)
+        result.append(cleaned)
+    return result
 
-    # 用两个及以上换行分段
-    paragraphs = re.split(r'\n{2,}', text)
 
-    cleaned_paragraphs = []
+def clean_texts(texts):
+    return normalize_batch(clean_text, texts)
 
-    for para in paragraphs:
-        # 段落内部：将多个空格合并成一个（保留换行）
-        para = re.sub(r'[ \t\r\f\v]+', ' ', para)
 
-        # 去除段落开头结尾的空格和换行
-        para = para.strip()
+def clean_paragraph_texts(texts):
+    return normalize_batch(clean_text_preserve_paragraphs, texts)
 
-        # 忽略空段落
-        if para:
-            cleaned_paragraphs.append(para)
 
-    # 重新用两个换行拼接成段落
-    return '\n\n'.join(cleaned_paragraphs)
+def sanitize_filenames(texts):
+    return normalize_batch(sanitize_filename, texts)